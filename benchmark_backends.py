@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark các backend estimator (model/estimators.py)
+So sánh thời gian fit, độ trễ dự đoán và accuracy của từng backend trên 6 datasets
+reasons & solutions và trên dữ liệu CLO (nếu đã có feature store snapshot)
+
+Cách chạy:
+    python benchmark_backends.py                                   # tất cả backend
+    python benchmark_backends.py hist_gradient_boosting extra_trees
+"""
+
+import sys
+import time
+import contextlib
+import io
+import numpy as np
+from sklearn.model_selection import train_test_split
+from model.config import BACKEND_PARAMS, REASONS_BACKEND_PARAMS
+from model.estimators import ESTIMATOR_BACKENDS, make_estimator, backend_label
+from model.unified_reasons_solutions_model import UnifiedReasonsSolutionsModel
+
+
+def load_reasons_datasets():
+    """(tên, X, y) cho từng dataset reasons & solutions"""
+    model = UnifiedReasonsSolutionsModel()
+    with contextlib.redirect_stdout(io.StringIO()):
+        model.load_all_datasets()
+    for key in model.datasets:
+        with contextlib.redirect_stdout(io.StringIO()):
+            X, y, _, _ = model.prepare_training_data(key)
+        if X is not None:
+            yield key, X, y
+
+
+def load_clo_dataset():
+    """(tên, X, y) của mô hình CLO từ feature store snapshot, None nếu chưa có snapshot"""
+    from model.data_loader import DataLoader
+    from model.feature_store import load_feature_store
+    from model.model_trainer import ModelTrainer
+    data_loader = DataLoader()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if not load_feature_store(data_loader):
+            return None
+        trainer = ModelTrainer(data_loader)
+        trainer.prepare_data()
+        trainer.convert_features()
+    return 'clo', trainer.X, trainer.y
+
+
+def benchmark(backend, params, X, y, latency_rows=200):
+    """Fit một backend, trả về (fit giây, µs/dòng khi dự đoán theo lô, ms/lần dự đoán 1 dòng, accuracy)"""
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    model = make_estimator(backend, params, random_state=42)
+
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    proba = model.predict_proba(X_test)
+    batch_us = (time.perf_counter() - start) / len(X_test) * 1e6
+    accuracy = np.mean(model.classes_[proba.argmax(axis=1)] == np.asarray(y_test))
+
+    rows = [X_test.iloc[i:i + 1] for i in range(min(latency_rows, len(X_test)))]
+    start = time.perf_counter()
+    for row in rows:
+        model.predict_proba(row)
+    single_ms = (time.perf_counter() - start) / len(rows) * 1e3
+    return fit_time, batch_us, single_ms, accuracy
+
+
+def main():
+    backends = sys.argv[1:] or list(ESTIMATOR_BACKENDS)
+    datasets = [(name, X, y, REASONS_BACKEND_PARAMS) for name, X, y in load_reasons_datasets()]
+    clo = load_clo_dataset()
+    if clo is None:
+        print("Chưa có feature store snapshot cho CLO (chạy CLOPredictor một lần) - bỏ qua dữ liệu CLO")
+    else:
+        datasets.append((*clo, BACKEND_PARAMS))
+
+    print("=" * 96)
+    print(f"{'Dataset':20} {'Backend':22} {'Rows':>7} {'Fit (s)':>9} {'Batch µs/row':>13} {'1-row ms':>9} {'Accuracy':>9}")
+    print("=" * 96)
+    totals = {backend: [0.0, 0.0] for backend in backends}
+    for name, X, y, params in datasets:
+        for backend in backends:
+            fit_time, batch_us, single_ms, accuracy = benchmark(backend, params.get(backend), X, y)
+            totals[backend][0] += fit_time
+            totals[backend][1] += accuracy / len(datasets)
+            print(f"{name:20} {backend_label(backend):22} {len(X):7} {fit_time:9.2f} {batch_us:13.1f} {single_ms:9.2f} {accuracy:9.4f}")
+        print("-" * 96)
+    for backend, (fit_time, accuracy) in totals.items():
+        print(f"{'TOTAL':20} {backend_label(backend):22} {'':7} {fit_time:9.2f} {'':13} {'':9} {accuracy:9.4f}")
+
+
+if __name__ == "__main__":
+    main()
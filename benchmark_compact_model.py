@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark bản xuất gọn của ensemble CLO (model/tree_export.py)
+So sánh VotingClassifier sklearn với CompactTreeEnsemble (đầy đủ và rút gọn) về kích thước,
+độ trễ dự đoán (theo lô và 1 dòng) và accuracy trên tập test
+
+Yêu cầu: đã có feature store snapshot và CLO model artifact (chạy CLOPredictor một lần)
+
+Cách chạy:
+    python benchmark_compact_model.py              # biến thể rút gọn: độ sâu 8, 100 cây
+    python benchmark_compact_model.py 10 150       # độ sâu, số cây của forest
+"""
+
+import sys
+import time
+import pickle
+import contextlib
+import io
+import numpy as np
+from sklearn.model_selection import train_test_split
+from model.data_loader import DataLoader
+from model.feature_store import load_feature_store
+from model.model_store import load_model_artifact, model_artifact_key
+from model.model_trainer import ModelTrainer
+from model.tree_export import export_compact_ensemble
+
+
+def load_trained_model():
+    """ModelTrainer với model CLO đã train (None nếu chưa có snapshot/artifact)"""
+    data_loader = DataLoader()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if not load_feature_store(data_loader):
+            return None
+        trainer = ModelTrainer(data_loader)
+        trainer.prepare_data()
+        if not load_model_artifact(trainer, model_artifact_key(False)):
+            return None
+        trainer.convert_features()
+    return trainer
+
+
+def measure(model, X_test, y_test, reference, latency_rows=200):
+    """(µs/dòng theo lô, ms/lần 1 dòng, accuracy, tỉ lệ trùng dự đoán, max |Δp| so với reference)"""
+    start = time.perf_counter()
+    proba = model.predict_proba(X_test)
+    batch_us = (time.perf_counter() - start) / len(X_test) * 1e6
+
+    rows = [X_test.iloc[i:i + 1] for i in range(min(latency_rows, len(X_test)))]
+    start = time.perf_counter()
+    for row in rows:
+        model.predict_proba(row)
+    single_ms = (time.perf_counter() - start) / len(rows) * 1e3
+
+    predicted = model.classes_[proba.argmax(axis=1)]
+    accuracy = np.mean(predicted == np.asarray(y_test))
+    agreement = np.mean(proba.argmax(axis=1) == reference.argmax(axis=1))
+    return batch_us, single_ms, accuracy, agreement, np.abs(proba - reference).max()
+
+
+def main():
+    max_depth = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    max_trees = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    trainer = load_trained_model()
+    if trainer is None:
+        print("Chưa có feature store snapshot / CLO model artifact (chạy CLOPredictor một lần)")
+        return
+    # Same hold-out split as ModelTrainer.train_models
+    _, X_test, _, y_test = train_test_split(trainer.X, trainer.y, test_size=0.2, random_state=42, stratify=trainer.y)
+    features = list(trainer.X.columns)
+
+    variants = [('sklearn VotingClassifier', trainer.model)]
+    start = time.perf_counter()
+    variants.append(('compact', export_compact_ensemble(trainer.model, features)))
+    export_time = time.perf_counter() - start
+    variants.append((f'compact pruned (depth {max_depth}, {max_trees} trees)',
+                     export_compact_ensemble(trainer.model, features, max_depth, max_trees)))
+    print(f"Export time: {export_time:.2f}s, test rows: {len(X_test)}")
+
+    reference = trainer.model.predict_proba(X_test)
+    print("=" * 118)
+    print(f"{'Model':40} {'Pickle MB':>10} {'Nodes':>9} {'Batch µs/row':>13} {'1-row ms':>9} "
+          f"{'Accuracy':>9} {'Agree':>7} {'Max |Δp|':>10}")
+    print("=" * 118)
+    for name, model in variants:
+        size_mb = len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)) / 2 ** 20
+        nodes = getattr(model, 'n_nodes', None)
+        batch_us, single_ms, accuracy, agreement, max_diff = measure(model, X_test, y_test, reference)
+        print(f"{name:40} {size_mb:10.2f} {nodes if nodes is not None else '-':>9} {batch_us:13.1f} "
+              f"{single_ms:9.2f} {accuracy:9.4f} {agreement:7.3f} {max_diff:10.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+So sánh hai báo cáo profiling của pipeline CLO (model/profiling.py)
+In thời gian wall/CPU, peak bộ nhớ và số dòng của từng stage, đánh dấu các stage chậm đi
+
+Tạo báo cáo:
+    CLOPredictor(profile=True)   hoặc đặt PROFILE_PIPELINE = True trong model/config.py
+
+Cách chạy:
+    python compare_profiles.py reports/profile/run_A.json reports/profile/run_B.json
+    python compare_profiles.py old.json new.json --threshold 0.2   # regression khi chậm hơn 20%
+"""
+
+import sys
+import argparse
+from model.profiling import load_report, diff_reports
+
+
+def _fmt(value, width, digits=2):
+    if value is None:
+        return f"{'-':>{width}}"
+    if isinstance(value, float):
+        return f"{value:{width}.{digits}f}"
+    return f"{value:>{width}}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="So sánh hai báo cáo profiling")
+    parser.add_argument('old', help="Báo cáo cũ (JSON)")
+    parser.add_argument('new', help="Báo cáo mới (JSON)")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="Tỉ lệ tăng wall time để coi là regression (mặc định 0.10)")
+    parser.add_argument('--min-seconds', type=float, default=0.05,
+                        help="Mức tăng wall time tối thiểu (giây) để coi là regression")
+    args = parser.parse_args()
+
+    old, new = load_report(args.old), load_report(args.new)
+    rows = diff_reports(old, new, args.threshold, args.min_seconds)
+
+    print(f"Old: {args.old} ({old['created']}, total {old['total_wall_s']:.2f}s)")
+    print(f"New: {args.new} ({new['created']}, total {new['total_wall_s']:.2f}s)")
+    # Reports written before cpu_scope existed measured the parent process only
+    old_scope, new_scope = old.get('cpu_scope', 'process only'), new.get('cpu_scope', 'process only')
+    if old_scope != new_scope:
+        print(f"⚠️ CPU columns are not comparable: old = {old_scope}; new = {new_scope}")
+    print("=" * 118)
+    print(f"{'Stage':44} {'Wall old':>9} {'Wall new':>9} {'Change':>8} {'CPU old':>8} {'CPU new':>8} "
+          f"{'MB old':>8} {'MB new':>8} {'Rows new':>9}")
+    print("=" * 118)
+    for row in rows:
+        name = '  ' * row['depth'] + row['stage'].rsplit('/', 1)[-1]
+        change = f"{row['wall_change'] * 100:+7.0f}%" if row['wall_change'] is not None else f"{'-':>8}"
+        flag = '  <-- REGRESSION' if row['regression'] else ''
+        print(f"{name[:44]:44} {_fmt(row['old_wall_s'], 9)} {_fmt(row['new_wall_s'], 9)} {change} "
+              f"{_fmt(row['old_cpu_s'], 8)} {_fmt(row['new_cpu_s'], 8)} "
+              f"{_fmt(row['old_peak_mb'], 8, 1)} {_fmt(row['new_peak_mb'], 8, 1)} {_fmt(row['new_rows'], 9)}{flag}")
+
+    regressions = [row['stage'] for row in rows if row['regression']]
+    print("=" * 118)
+    if regressions:
+        print(f"{len(regressions)} stage(s) slower than {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+    print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
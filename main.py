@@ -63,6 +63,20 @@ def main():
             if not all([student_id, lecturer, subject_id]):
                 print("❌ Vui lòng nhập đầy đủ thông tin!")
                 continue
+            
+            # Khớp tên giảng viên / môn học không phân biệt dấu, hoa thường (môn học theo mã hoặc tên)
+            resolved_lecturer = predictor.resolve_input('lecturer', lecturer)
+            if resolved_lecturer and resolved_lecturer != lecturer:
+                print(f"✅ Giảng viên: {lecturer} -> {resolved_lecturer}")
+                lecturer = resolved_lecturer
+            resolved_subject = predictor.resolve_input('subject_id', subject_id)
+            if resolved_subject is None:
+                suggestions = predictor.suggest_options('subject_id', subject_id)
+                print(f"❌ Không tìm thấy môn học '{subject_id}'. Gợi ý: {', '.join(suggestions)}")
+                continue
+            if resolved_subject != subject_id:
+                print(f"✅ Môn học: {subject_id} -> {resolved_subject}")
+                subject_id = resolved_subject
                 
         except KeyboardInterrupt:
             print("\n👋 Tạm biệt!")
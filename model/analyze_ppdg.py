@@ -3,13 +3,18 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from sklearn.preprocessing import LabelEncoder
+try:
+    from .method_table import load_method_table
+except ImportError:
+    # Chạy trực tiếp dưới dạng script
+    from method_table import load_method_table
 import warnings
 warnings.filterwarnings('ignore')
 
 def load_ppdg_data():
-    """Đọc dữ liệu PPDG từ file Excel"""
+    """Bảng PPDG (0/1 theo mã EM chuẩn) từ MethodTable dùng chung"""
     try:
-        df = pd.read_excel('dulieu/PPDG.xlsx')
+        df = load_method_table().frame('EM')
         print("=== DỮ LIỆU PPDG ===")
         print(f"Số lượng bản ghi: {len(df)}")
         print(f"Các cột: {list(df.columns)}")
@@ -35,7 +40,7 @@ def create_ppdg_mapping():
         'EM 8': 'Đánh giá báo cáo/tiểu luận (Written Report/Essay Assessment)',
         'EM 9': 'Đánh giá thực tập (Internship Assessment)',
         'EM 10': 'Đánh giá báo cáo thực tập tại doanh nghiệp (Internship Report At Enterprise Assessment)',
-        'EM11': 'Đánh giá thực hành tại phòng thí nghiệm (Practice In The Laboratory Assessment)',
+        'EM 11': 'Đánh giá thực hành tại phòng thí nghiệm (Practice In The Laboratory Assessment)',
         'EM 12': 'Đánh giá bài tập lớn/Đồ án cá nhân (Major Assignment/Individual Project Assessment)',
         'EM 14': 'Đánh giá khoá luận tốt nghiệp (Graduation Thesis Assessment)'
     }
@@ -53,14 +58,14 @@ def analyze_ppdg_usage(df):
     usage_stats = {}
     for col in em_columns:
         # Đếm số môn học sử dụng phương pháp này
-        usage_count = df[col].notna().sum()
+        usage_count = df[col].sum()
         total_subjects = len(df)
         usage_percentage = (usage_count / total_subjects) * 100
         
         usage_stats[col] = {
             'count': usage_count,
             'percentage': usage_percentage,
-            'subjects': df[df[col].notna()]['Subject_Name'].tolist()
+            'subjects': df[df[col] == 1]['Subject_Name'].tolist()
         }
     
     # Sắp xếp theo tần suất sử dụng
@@ -79,7 +84,7 @@ def create_ppdg_matrix(df, em_columns):
     print("\n=== MA TRẬN TƯƠNG QUAN SỬ DỤNG PPDG ===")
     
     # Tạo ma trận nhị phân (1 = có sử dụng, 0 = không sử dụng)
-    ppdg_matrix = df[em_columns].notna().astype(int)
+    ppdg_matrix = df[em_columns].astype(int)
     
     # Tính ma trận tương quan
     correlation_matrix = ppdg_matrix.corr()
@@ -116,7 +121,7 @@ def analyze_ppdg_patterns(df, em_columns):
     print("\n=== PHÂN TÍCH PATTERN SỬ DỤNG PPDG ===")
     
     # Tạo ma trận nhị phân
-    ppdg_matrix = df[em_columns].notna().astype(int)
+    ppdg_matrix = df[em_columns].astype(int)
     
     # Phân tích các combination phổ biến
     print("Các combination PPDG phổ biến:")
@@ -182,7 +187,7 @@ def generate_clo_explanation_standalone(usage_stats, ppdg_mapping):
     
     # Phân tích theo loại PPDG
     formative_assessment = ['EM 1', 'EM 2', 'EM 3', 'EM 4', 'EM 5']  # Đánh giá quá trình
-    summative_assessment = ['EM 6', 'EM 7', 'EM 8', 'EM 9', 'EM 10', 'EM11', 'EM 12', 'EM 14']  # Đánh giá tổng kết
+    summative_assessment = ['EM 6', 'EM 7', 'EM 8', 'EM 9', 'EM 10', 'EM 11', 'EM 12', 'EM 14']  # Đánh giá tổng kết
     
     print("\n1. Đánh giá quá trình (Formative Assessment):")
     for em in formative_assessment:
@@ -45,6 +45,46 @@ ET_PARAMS = {
     'random_state': 42
 }
 
+HGB_PARAMS = {
+    'max_iter': 100,          # Number of boosting iterations
+    'max_depth': 10,          # Maximum depth of each tree
+    'learning_rate': 0.05,    # Learning rate shrinks the contribution of each tree
+    'random_state': 42
+}
+
+# === ESTIMATOR BACKENDS (see model/estimators.py) ===
+# Available: 'random_forest', 'extra_trees', 'gradient_boosting', 'hist_gradient_boosting'
+# Members of the CLO soft-voting ensemble (ModelTrainer): member name -> backend
+CLO_BACKENDS = {
+    'rf': 'random_forest',
+    'gb': 'gradient_boosting'
+}
+
+BACKEND_PARAMS = {
+    'random_forest': RF_PARAMS,
+    'extra_trees': ET_PARAMS,
+    'gradient_boosting': GB_PARAMS,
+    'hist_gradient_boosting': HGB_PARAMS
+}
+
+# Candidate backends for each UnifiedReasonsSolutionsModel dataset (the most accurate one is kept)
+REASONS_BACKENDS = ['random_forest', 'gradient_boosting']
+
+REASONS_BACKEND_PARAMS = {
+    'random_forest': {'n_estimators': 200, 'max_depth': 15, 'min_samples_split': 2, 'class_weight': 'balanced'},
+    'extra_trees': {'n_estimators': 200, 'max_depth': 15, 'min_samples_split': 2, 'class_weight': 'balanced'},
+    'gradient_boosting': {'n_estimators': 100, 'max_depth': 10, 'learning_rate': 0.1},
+    'hist_gradient_boosting': {'max_iter': 100, 'max_depth': 10, 'learning_rate': 0.1}
+}
+
+# Parallel training of the reasons models: dataset x backend jobs on a process pool
+# sharing REASONS_MAX_WORKERS cores (None = CPU count)
+REASONS_PARALLEL = True
+REASONS_MAX_WORKERS = None
+
+# Saved reasons models (model/reason_store.py): store the chosen tree models as flattened node arrays
+REASONS_COMPACT_ESTIMATORS = True
+
 # === OPTIMIZED ENSEMBLE CONFIGURATION ===
 BEST_ENSEMBLE_CONFIG = {
     'name': 'Voting_Soft_Top3',
@@ -79,4 +119,83 @@ DATA_FILES = {
     'demographic': 'dulieu/nhankhau.xlsx',
     'conduct': 'dulieu/diemrenluyen.xlsx',
     'self_study': 'dulieu/tuhoc.xlsx'
-} 
\ No newline at end of file
+}
+
+# On-disk cache of parsed Excel sources (see model/excel_cache.py)
+CACHE_DIR = 'cache'
+EXCEL_CACHE_ENABLED = True
+
+# Parallel workbook ingestion in DataLoader (None = one worker per cold workbook, up to CPU count)
+PARALLEL_LOAD = True
+LOAD_MAX_WORKERS = None
+
+# Engineered feature store (see model/feature_store.py); bump the version to invalidate snapshots
+USE_FEATURE_STORE = True
+FEATURE_STORE_VERSION = 1
+
+# Columns read from each source and their dtypes (streaming, column-projected reader in
+# model/excel_stream.py; 'str' keeps key values as text, 'float' coerces non-numeric cells to NaN).
+# Sources not listed here are read in full.
+SOURCE_COLUMNS = {
+    'main_data': {
+        'Student_ID': 'str', 'FirstName': 'str', 'LastName': 'str', 'Major_Name': 'str', 'Lecturer_Name': 'str',
+        'Subject_ID': 'str', 'year': 'str', 'school_year': 'str', 'semester': 'str',
+        'exam_score': 'str', 'summary_score': 'str'  # 'VT' (absent) or a score, parsed in process_main_data
+    },
+    'conduct': {
+        'Student_ID': 'str', 'school_year': 'str', 'semester': 'str',
+        'conduct_score': 'float', 'student_conduct_classification': 'str'
+    },
+    'self_study': {
+        'Student_ID': 'str', 'year': 'str', 'semester': 'str',
+        'accumulated_study_hours': 'float', 'accumulated_study_minutes': 'float'
+    }
+}
+EXCEL_CHUNK_SIZE = 50000
+
+# Compact dtype schema for the main grade frame (DataLoader.apply_main_schema)
+MAIN_DATA_SCHEMA = {
+    'category': ['Student_ID', 'FirstName', 'LastName', 'Major_Name', 'Lecturer_Name',
+                 'Subject_ID', 'year', 'school_year'],
+    'int8': ['semester', 'passed', 'clo_achieved'],
+    'float32': ['exam_score_10', 'exam_score_6', 'summary_score_numeric'],
+    'drop': ['exam_score', 'summary_score']
+}
+
+# Trained CLO ensemble artifact (see model/model_store.py); bump the version to force retraining
+USE_MODEL_ARTIFACT = True
+MODEL_ARTIFACT_VERSION = 1
+CLO_MODEL_DIR = 'trained_models/clo_model'
+
+# Incremental retraining (ModelTrainer.update_models): when only new terms were appended to the
+# data, grow the saved ensemble on the new rows instead of retraining it from scratch
+INCREMENTAL_TRAINING = True
+TERM_COLUMNS = ['year', 'semester']  # Rows of terms after the artifact's watermark are new
+INCREMENTAL_GROWTH = 0.25  # Trees/stages added to each member, relative to its current size
+# Opt-in benchmark: also fit a full retrain on each incremental run to report the accuracy delta
+# and speedup (costs as much as a full retrain)
+INCREMENTAL_COMPARE_FULL = False
+
+# Opt-in stage instrumentation of CLOPredictor (see model/profiling.py and compare_profiles.py)
+PROFILE_PIPELINE = False
+PROFILE_MEMORY = True  # tracemalloc peak per stage (slows the pipeline down noticeably)
+PROFILE_REPORT_DIR = 'reports/profile'
+
+# Serve CLO predictions from a flattened float32 copy of the ensemble (model/tree_export.py);
+# set the prune options to serve a smaller depth/tree-limited variant (see benchmark_compact_model.py)
+COMPACT_PREDICT = True
+COMPACT_PRUNE_DEPTH = None
+COMPACT_MAX_TREES = None
+
+# Batch prediction (Predictor.predict_many, predict_batch.py): rows per predict_proba call
+PREDICT_BATCH_SIZE = 4096
+
+# Hyperparameter search in ModelTrainer.optimize_hyperparameters
+# 'halving' = successive halving (HalvingRandomSearchCV), 'random' = full-budget RandomizedSearchCV
+SEARCH_MODE = 'halving'
+SEARCH_N_JOBS = None  # Core budget shared by the concurrent LR/RF/GB searches (None = all CPUs)
+SEARCH_CACHE_ENABLED = True
+
+# Cross-validation in ModelTrainer.train_models (folds run in parallel, -1 = all CPUs)
+TRAIN_CV_FOLDS = 5
+TRAIN_N_JOBS = -1
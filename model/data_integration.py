@@ -1,5 +1,71 @@
+import numpy as np
 import pandas as pd
 from sklearn.preprocessing import LabelEncoder
+from .utils import to_string_category
+
+
+def period_codes(*period_frames):
+    """Mã hóa các cặp (năm học, học kỳ) thành số nguyên giữ nguyên thứ tự so sánh chuỗi.
+
+    Mỗi phần tử của ``period_frames`` là một tuple (year_series, semester_series).
+    Trả về danh sách mảng mã tương ứng, dùng chung một bảng mã cho tất cả các nguồn.
+    """
+    # '\x00' nhỏ hơn mọi ký tự nên so sánh chuỗi ghép tương đương so sánh tuple (year, semester)
+    keys = [year.astype(str).values.astype(object) + '\x00' + semester.astype(str).values.astype(object)
+            for year, semester in period_frames]
+    _, codes = np.unique(np.concatenate(keys), return_inverse=True)
+    split_points = np.cumsum([len(k) for k in keys])[:-1]
+    return [c.astype(np.int64) for c in np.split(codes, split_points)]
+
+
+def asof_join_by_period(left, right, left_period, right_period, value_cols, by='Student_ID', exact=False):
+    """As-of join theo (by, năm học, học kỳ): với mỗi dòng của ``left`` lấy bản ghi mới nhất
+    của ``right`` có kỳ <= kỳ của dòng đó (hoặc đúng bằng kỳ đó nếu ``exact=True``).
+
+    Cả hai bảng chỉ được sắp xếp một lần nên chi phí là O(n log n) thay vì O(rows x records).
+    Trả về DataFrame gồm ``value_cols`` và cột ``_matched``, cùng index với ``left``.
+    """
+    left_codes, right_codes = period_codes(
+        (left[left_period[0]], left[left_period[1]]),
+        (right[right_period[0]], right[right_period[1]])
+    )
+    # Khóa so khớp là mã category của left (chuỗi); giá trị right không có trong left -> -2
+    left_by = to_string_category(left[by])
+    right_by = pd.Categorical(right[by].astype(str), categories=left_by.cat.categories).codes
+    left_keys = pd.DataFrame({
+        by: left_by.cat.codes.values.astype(np.int64),
+        '_period': left_codes,
+        '_position': np.arange(len(left))
+    }).sort_values('_period', kind='mergesort')
+    right_keys = right[value_cols].copy()
+    right_keys[by] = np.where(right_by >= 0, right_by, -2).astype(np.int64)
+    right_keys['_period'] = right_codes
+    right_keys['_matched'] = True
+    right_keys = right_keys.sort_values('_period', kind='mergesort')
+
+    joined = pd.merge_asof(
+        left_keys, right_keys, on='_period', by=by,
+        direction='backward', tolerance=0 if exact else None
+    )
+    joined = joined.sort_values('_position').reset_index(drop=True)
+    joined['_matched'] = joined['_matched'].fillna(False).astype(bool)
+    joined.index = left.index
+    return joined[value_cols + ['_matched']]
+
+
+def method_matrix(method_df, prefix):
+    """Ma trận uint8 môn học x phương pháp (TM/EM) từ file PPGD/PPDG.
+
+    Index là Subject_ID (chuỗi), cột ``{prefix}_{số}`` theo mã phương pháp, ví dụ
+    'TM 11' -> 'TM_11', 'EM11' -> 'EM_11'. Giá trị 1 nếu ô có đánh dấu.
+    """
+    codes = method_df.columns.to_series().astype(str).str.extract(rf'^{prefix}\s*(\d+)$')[0].dropna().astype(int)
+    codes = codes.sort_values(kind='mergesort')
+    matrix = method_df[codes.index].notna().astype(np.uint8)
+    matrix.columns = [f'{prefix}_{n}' for n in codes]
+    matrix.index = method_df['Subject_ID'].astype(str)
+    return matrix[~matrix.index.duplicated(keep='last')]
+
 
 class DataIntegration:
     def __init__(self, data_loader):
@@ -14,93 +80,67 @@ class DataIntegration:
             print("No demographic data available")
             return
         
-        # Initialize demographic columns with default values
-        self.df['gender_encoded'] = -1
-        self.df['religion_encoded'] = -1
-        self.df['birth_place_encoded'] = -1
-        self.df['ethnicity_encoded'] = -1
+        nhankhau_df = self.data_loader.nhankhau_df
         
-        # Create mapping from Student_ID to demographic information
-        demographic_mapping = {}
-        for _, row in self.data_loader.nhankhau_df.iterrows():
-            student_id = row['Student_ID']
-            demographic_info = {}
-            
-            # Process gender
-            if self.data_loader.gender_col and pd.notna(row[self.data_loader.gender_col]):
-                gender_value = str(row[self.data_loader.gender_col]).strip()
-                if gender_value in ['Nam', 'Male', '1']:
-                    demographic_info['gender'] = 'Nam'
-                elif gender_value in ['Nữ', 'Female', '0']:
-                    demographic_info['gender'] = 'Nữ'
-                else:
-                    demographic_info['gender'] = 'Khác'
-            
-            # Process religion
-            if self.data_loader.religion_col and pd.notna(row[self.data_loader.religion_col]):
-                religion_value = str(row[self.data_loader.religion_col]).strip()
-                if religion_value in ['Không', 'None', '']:
-                    demographic_info['religion'] = 'Không tôn giáo'
-                else:
-                    demographic_info['religion'] = religion_value
-            
-            # Process birth place
-            if self.data_loader.birth_place_col and pd.notna(row[self.data_loader.birth_place_col]):
-                birth_place_value = str(row[self.data_loader.birth_place_col]).strip()
-                demographic_info['birth_place'] = birth_place_value
-            
-            # Process ethnicity
-            if self.data_loader.ethnicity_col and pd.notna(row[self.data_loader.ethnicity_col]):
-                ethnicity_value = str(row[self.data_loader.ethnicity_col]).strip()
-                if ethnicity_value in ['Kinh', 'Việt']:
-                    demographic_info['ethnicity'] = 'Kinh'
-                else:
-                    demographic_info['ethnicity'] = ethnicity_value
-            
-            if demographic_info:
-                demographic_mapping[student_id] = demographic_info
+        def normalized(col):
+            """Giá trị đã strip của một cột nhân khẩu (NaN nếu thiếu cột/giá trị)"""
+            if not col:
+                return pd.Series(np.nan, index=nhankhau_df.index, dtype=object)
+            values = nhankhau_df[col]
+            return values.astype(str).str.strip().where(values.notna())
+        
+        # Normalize demographic columns (column-wise rules)
+        gender = normalized(self.data_loader.gender_col)
+        gender = pd.Series(np.select(
+            [gender.isin(['Nam', 'Male', '1']), gender.isin(['Nữ', 'Female', '0'])],
+            ['Nam', 'Nữ'], default='Khác'
+        ), index=gender.index).where(gender.notna())
         
-        # Integrate demographic information into main dataframe
-        matched_count = 0
-        for idx, row in self.df.iterrows():
-            student_id = row['Student_ID']
-            if student_id in demographic_mapping:
-                demo_info = demographic_mapping[student_id]
-                matched_count += 1
-                
-                # Assign demographic values
-                if 'gender' in demo_info:
-                    self.df.at[idx, 'gender_encoded'] = demo_info['gender']
-                if 'religion' in demo_info:
-                    self.df.at[idx, 'religion_encoded'] = demo_info['religion']
-                if 'birth_place' in demo_info:
-                    self.df.at[idx, 'birth_place_encoded'] = demo_info['birth_place']
-                if 'ethnicity' in demo_info:
-                    self.df.at[idx, 'ethnicity_encoded'] = demo_info['ethnicity']
+        religion = normalized(self.data_loader.religion_col)
+        religion = religion.mask(religion.isin(['Không', 'None', '']), 'Không tôn giáo')
         
-        # Encode demographic variables
-        if self.df['gender_encoded'].nunique() > 1:
-            self.df['gender_encoded'] = self.data_loader.le_gender.fit_transform(self.df['gender_encoded'].astype(str))
-        else:
-            self.df['gender_encoded'] = 0
+        birth_place = normalized(self.data_loader.birth_place_col)
         
-        if self.df['religion_encoded'].nunique() > 1:
-            self.df['religion_encoded'] = self.data_loader.le_religion.fit_transform(self.df['religion_encoded'].astype(str))
-        else:
-            self.df['religion_encoded'] = 0
+        ethnicity = normalized(self.data_loader.ethnicity_col)
+        ethnicity = ethnicity.mask(ethnicity.isin(['Kinh', 'Việt']), 'Kinh')
         
-        if self.df['birth_place_encoded'].nunique() > 1:
-            self.df['birth_place_encoded'] = self.data_loader.le_birth_place.fit_transform(self.df['birth_place_encoded'].astype(str))
-        else:
-            self.df['birth_place_encoded'] = 0
+        demographic_cols = ['gender_encoded', 'religion_encoded', 'birth_place_encoded', 'ethnicity_encoded']
+        demographic = pd.DataFrame({
+            'Student_ID': nhankhau_df['Student_ID'],
+            'gender_encoded': gender,
+            'religion_encoded': religion,
+            'birth_place_encoded': birth_place,
+            'ethnicity_encoded': ethnicity
+        })
         
-        if self.df['ethnicity_encoded'].nunique() > 1:
-            self.df['ethnicity_encoded'] = self.data_loader.le_ethnicity.fit_transform(self.df['ethnicity_encoded'].astype(str))
-        else:
-            self.df['ethnicity_encoded'] = 0
+        # One record per student: the last row having any demographic information
+        demographic = demographic[demographic[demographic_cols].notna().any(axis=1)]
+        demographic = demographic.dropna(subset=['Student_ID']).drop_duplicates('Student_ID', keep='last')
+        
+        # Integrate demographic information into main dataframe with a single merge
+        self.df['Student_ID'] = to_string_category(self.df['Student_ID'])
+        demographic['Student_ID'] = demographic['Student_ID'].astype(str)
+        merged = self.df[['Student_ID']].merge(demographic, on='Student_ID', how='left', indicator=True)
+        matched_count = int((merged['_merge'] == 'both').sum())
+        
+        # Encode demographic variables (-1 marks missing values, as before)
+        encoders = {
+            'gender_encoded': self.data_loader.le_gender,
+            'religion_encoded': self.data_loader.le_religion,
+            'birth_place_encoded': self.data_loader.le_birth_place,
+            'ethnicity_encoded': self.data_loader.le_ethnicity
+        }
+        for col, le in encoders.items():
+            values = merged[col].fillna('-1').astype(str)
+            codes, classes = pd.factorize(values, sort=True)
+            if len(classes) > 1:
+                le.fit(classes)
+                self.df[col] = codes
+            else:
+                self.df[col] = 0
         
         # Create demographic feature list
-        self.data_loader.demographic_features = ['gender_encoded', 'religion_encoded', 'birth_place_encoded', 'ethnicity_encoded']
+        self.data_loader.demographic_features = demographic_cols
         
         print(f"Successfully integrated demographic data for {matched_count} student records")
         print(f"Demographic features added: {self.data_loader.demographic_features}")
@@ -118,63 +158,41 @@ class DataIntegration:
             self.data_loader.conduct_df['Student_ID'] = self.data_loader.conduct_df['Student_ID'].astype(str)
             self.data_loader.conduct_df['school_year'] = self.data_loader.conduct_df['school_year'].astype(str)
             self.data_loader.conduct_df['semester'] = self.data_loader.conduct_df['semester'].astype(str)
-            self.df['Student_ID'] = self.df['Student_ID'].astype(str)
-            self.df['school_year'] = self.df['year'].astype(str) if 'year' in self.df.columns else self.df['school_year'].astype(str)
-            self.df['semester'] = self.df['semester'].astype(str) if 'semester' in self.df.columns else '1'
+            self.df['Student_ID'] = to_string_category(self.df['Student_ID'])
+            self.df['school_year'] = to_string_category(self.df['year'] if 'year' in self.df.columns else self.df['school_year'])
+            self.df['semester'] = to_string_category(self.df['semester']) if 'semester' in self.df.columns else '1'
 
-            def get_conduct_row(sid, year, semester):
-                df = self.data_loader.conduct_df[self.data_loader.conduct_df['Student_ID'] == sid]
-                if df.empty:
-                    return None
-                df = df[(df['school_year'] < year) | ((df['school_year'] == year) & (df['semester'] <= semester))]
-                if df.empty:
-                    return None
-                return df.sort_values(['school_year', 'semester'], ascending=[False, False]).iloc[0]
+            conduct_df = self.data_loader.conduct_df
+            conduct_sorted = conduct_df.assign(
+                _conduct_period=period_codes((conduct_df['school_year'], conduct_df['semester']))[0]
+            ).sort_values(['Student_ID', '_conduct_period'], kind='mergesort')
 
-            avg_conduct_scores = []
-            latest_conduct_scores = []
-            latest_conduct_semesters = []
-            latest_conduct_years = []
-            conduct_trends = []
-            latest_classifications = []
-            num_conduct_semesters = []
+            # Một bản ghi cho mỗi (sinh viên, kỳ); trend = điểm kỳ này - điểm kỳ liền trước của sinh viên
+            conduct_periods = conduct_sorted.drop_duplicates(['Student_ID', '_conduct_period'], keep='last').copy()
+            previous_score = conduct_periods.groupby('Student_ID')['conduct_score'].shift(1)
+            conduct_periods['conduct_trend'] = (conduct_periods['conduct_score'] - previous_score).fillna(0)
 
-            for idx, row in self.df.iterrows():
-                sid = row['Student_ID']
-                year = row['school_year']
-                semester = row['semester']
-                student_conduct = self.data_loader.conduct_df[self.data_loader.conduct_df['Student_ID'] == sid]
-                avg_conduct = student_conduct['conduct_score'].mean() if not student_conduct.empty else 65.0
-                avg_conduct_scores.append(avg_conduct)
-                conduct_row = get_conduct_row(sid, year, semester)
-                if conduct_row is not None:
-                    latest_conduct_scores.append(conduct_row['conduct_score'])
-                    latest_conduct_semesters.append(conduct_row['semester'])
-                    latest_conduct_years.append(conduct_row['school_year'])
-                    latest_classifications.append(conduct_row['student_conduct_classification'])
-                    prev = student_conduct[(student_conduct['school_year'] < conduct_row['school_year']) | ((student_conduct['school_year'] == conduct_row['school_year']) & (student_conduct['semester'] < conduct_row['semester']))]
-                    if not prev.empty:
-                        prev_row = prev.sort_values(['school_year', 'semester'], ascending=[False, False]).iloc[0]
-                        trend = conduct_row['conduct_score'] - prev_row['conduct_score']
-                    else:
-                        trend = 0
-                    conduct_trends.append(trend)
-                    num_conduct_semesters.append(len(student_conduct))
-                else:
-                    latest_conduct_scores.append(65.0)
-                    latest_conduct_semesters.append(1)
-                    latest_conduct_years.append(2324)
-                    latest_classifications.append('Fair')
-                    conduct_trends.append(0)
-                    num_conduct_semesters.append(0)
+            latest = asof_join_by_period(
+                self.df, conduct_periods,
+                left_period=('school_year', 'semester'),
+                right_period=('school_year', 'semester'),
+                value_cols=['conduct_score', 'semester', 'school_year',
+                            'student_conduct_classification', 'conduct_trend']
+            )
+            matched = latest['_matched']
 
-            self.df['avg_conduct_score'] = avg_conduct_scores
-            self.df['latest_conduct_score'] = latest_conduct_scores
-            self.df['latest_conduct_semester'] = latest_conduct_semesters
-            self.df['latest_conduct_year'] = latest_conduct_years
-            self.df['conduct_trend'] = conduct_trends
-            self.df['latest_conduct_classification'] = latest_classifications
-            self.df['num_conduct_semesters'] = num_conduct_semesters
+            # Trung bình và số kỳ tính trên toàn bộ lịch sử rèn luyện của sinh viên
+            student_stats = conduct_sorted.groupby('Student_ID')['conduct_score'].agg(['mean', 'size'])
+            avg_conduct = self.df['Student_ID'].map(student_stats['mean'])
+            num_semesters = self.df['Student_ID'].map(student_stats['size'])
+
+            self.df['avg_conduct_score'] = avg_conduct.fillna(65.0)
+            self.df['latest_conduct_score'] = latest['conduct_score'].where(matched, 65.0)
+            self.df['latest_conduct_semester'] = latest['semester'].astype(object).where(matched, 1)
+            self.df['latest_conduct_year'] = latest['school_year'].astype(object).where(matched, 2324)
+            self.df['conduct_trend'] = latest['conduct_trend'].where(matched, 0)
+            self.df['latest_conduct_classification'] = latest['student_conduct_classification'].astype(object).where(matched, 'Fair')
+            self.df['num_conduct_semesters'] = num_semesters.where(matched, 0).astype(int)
             self.df['conduct_classification_encoded'] = self.data_loader.le_conduct_classification.fit_transform(self.df['latest_conduct_classification'])
             
             self.data_loader.conduct_features = [
@@ -202,9 +220,9 @@ class DataIntegration:
             tuhoc_df['Student_ID'] = tuhoc_df['Student_ID'].astype(str)
             tuhoc_df['year'] = tuhoc_df['year'].astype(str)
             tuhoc_df['semester'] = tuhoc_df['semester'].astype(str)
-            self.df['Student_ID'] = self.df['Student_ID'].astype(str)
-            self.df['year'] = self.df['year'].astype(str)
-            self.df['semester'] = self.df['semester'].astype(str)
+            self.df['Student_ID'] = to_string_category(self.df['Student_ID'])
+            self.df['year'] = to_string_category(self.df['year'])
+            self.df['semester'] = to_string_category(self.df['semester'])
             
             # Aggregate total hours and minutes by student, year, semester
             tuhoc_agg = tuhoc_df.groupby(['Student_ID', 'year', 'semester']).agg({
@@ -216,74 +234,44 @@ class DataIntegration:
                 'accumulated_study_minutes': 'study_minutes_this_semester'
             }, inplace=True)
             
-            # Merge into self.df by Student_ID, year, semester
-            self.df = pd.merge(
-                self.df,
-                tuhoc_agg,
-                left_on=['Student_ID', 'year', 'semester'],
-                right_on=['Student_ID', 'year', 'semester'],
-                how='left'
+            # Join into self.df by Student_ID, year, semester (exact period match)
+            study_cols = ['study_hours_this_semester', 'study_minutes_this_semester']
+            study = asof_join_by_period(
+                self.df, tuhoc_agg,
+                left_period=('year', 'semester'),
+                right_period=('year', 'semester'),
+                value_cols=study_cols,
+                exact=True
             )
             
             # Fill missing values with 0
-            self.df['study_hours_this_semester'] = self.df['study_hours_this_semester'].fillna(0)
-            self.df['study_minutes_this_semester'] = self.df['study_minutes_this_semester'].fillna(0)
+            self.df = pd.concat([self.df, study[study_cols].fillna(0)], axis=1).reset_index(drop=True)
             print("Đã tích hợp dữ liệu tự học vào self.df!")
         except Exception as e:
             print(f"Không thể tích hợp dữ liệu tự học: {e}")
 
     def create_teaching_method_features(self):
         """Create teaching method features"""
-        tm_mapping = {}
-        for _, row in self.data_loader.ppgd_df.iterrows():
-            subject_id = str(row['Subject_ID'])
-            tm_features = []
-            for col in self.data_loader.ppgd_df.columns:
-                if col.startswith('TM ') and pd.notna(row[col]):
-                    tm_features.append(1)
-                elif col.startswith('TM '):
-                    tm_features.append(0)
-            tm_mapping[subject_id] = tm_features
-        
-        # Add TM columns to df
-        for i in range(8):
-            col_name = f'TM_{i+1}'
-            self.df[col_name] = 0
-            self.data_loader.tm_columns.append(col_name)
-        
-        for idx, row in self.df.iterrows():
-            subject_id = str(row['Subject_ID'])
-            if subject_id in tm_mapping:
-                tm_features = tm_mapping[subject_id]
-                for i, value in enumerate(tm_features):
-                    if i < 8:
-                        self.df.at[idx, f'TM_{i+1}'] = value
+        self.data_loader.tm_matrix = method_matrix(self.data_loader.ppgd_df, 'TM')
+        self.attach_method_matrix(self.data_loader.tm_matrix, self.data_loader.tm_columns)
 
     def create_assessment_method_features(self):
         """Create assessment method features"""
-        em_mapping = {}
-        for _, row in self.data_loader.ppdg_df.iterrows():
-            subject_id = str(row['Subject_ID'])
-            em_features = []
-            for col in self.data_loader.ppdg_df.columns:
-                if col.startswith('EM ') and pd.notna(row[col]):
-                    em_features.append(1)
-                elif col.startswith('EM '):
-                    em_features.append(0)
-            em_mapping[subject_id] = em_features
-        
-        for i in range(14):
-            col_name = f'EM_{i+1}'
-            self.df[col_name] = 0
-            self.data_loader.em_columns.append(col_name)
-        
-        for idx, row in self.df.iterrows():
-            subject_id = str(row['Subject_ID'])
-            if subject_id in em_mapping:
-                em_features = em_mapping[subject_id]
-                for i, value in enumerate(em_features):
-                    if i < 14:
-                        self.df.at[idx, f'EM_{i+1}'] = value
+        self.data_loader.em_matrix = method_matrix(self.data_loader.ppdg_df, 'EM')
+        self.attach_method_matrix(self.data_loader.em_matrix, self.data_loader.em_columns)
+
+    def attach_method_matrix(self, matrix, feature_columns):
+        """Gắn ma trận môn học x phương pháp vào self.df bằng một phép take theo Subject_ID"""
+        subjects = to_string_category(self.df['Subject_ID'])
+        codes = subjects.cat.codes.values
+        positions = matrix.index.get_indexer(subjects.cat.categories)[codes]
+        positions[codes < 0] = -1
+        # Môn không có trong file phương pháp -> dòng toàn 0 (dòng cuối)
+        values = np.vstack([matrix.values, np.zeros((1, matrix.shape[1]), dtype=np.uint8)])
+        rows = values[np.where(positions >= 0, positions, len(matrix))]
+        for i, col in enumerate(matrix.columns):
+            self.df[col] = rows[:, i]
+            feature_columns.append(col)
 
     def finalize_features(self):
         """Finalize feature list and prepare X, y"""
@@ -1,10 +1,51 @@
+import os
+import time
+from bisect import bisect_left
+import numpy as np
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from sklearn.preprocessing import LabelEncoder
-from .config import DATA_FILES, SUBJECT_REPLACE
-from .utils import convert_to_numeric, convert_to_scale_6
+from .config import DATA_FILES, SUBJECT_REPLACE, PARALLEL_LOAD, LOAD_MAX_WORKERS, SOURCE_COLUMNS, MAIN_DATA_SCHEMA
+from .utils import convert_to_numeric, convert_to_scale_6, to_string_category
+from .suggest_index import SuggestionIndex
+from .excel_cache import read_excel_cached, is_cache_fresh
+
+
+def source_read_options(key):
+    """Read options for one DATA_FILES source: only the SOURCE_COLUMNS it declares (with their dtypes), if any"""
+    columns = SOURCE_COLUMNS.get(key)
+    return {'columns': list(columns), 'dtypes': dict(columns)} if columns else {}
+
+
+def read_source_file(path, **read_kwargs):
+    """Read one workbook (through the Excel cache) and return (DataFrame, seconds)"""
+    start = time.perf_counter()
+    df = read_excel_cached(path, **read_kwargs)
+    return df, time.perf_counter() - start
+
 
 class DataLoader:
-    def __init__(self):
+    # validate_input type -> key column of the grade frame
+    OPTION_COLUMNS = {
+        'student_id': 'Student_ID',
+        'lecturer': 'Lecturer_Name',
+        'subject_id': 'Subject_ID'
+    }
+    
+    # Encoded feature column -> LabelEncoder attribute
+    ENCODED_COLUMNS = {
+        'student_id_encoded': 'le_student_id',
+        'lecturer_encoded': 'le_lecturer',
+        'subject_encoded': 'le_subject',
+        'gender_encoded': 'le_gender',
+        'religion_encoded': 'le_religion',
+        'birth_place_encoded': 'le_birth_place',
+        'ethnicity_encoded': 'le_ethnicity',
+        'conduct_classification_encoded': 'le_conduct_classification'
+    }
+    
+    def __init__(self, parallel_load=PARALLEL_LOAD, max_workers=LOAD_MAX_WORKERS):
         self.df = None
         self.ppgd_df = None
         self.ppdg_df = None
@@ -35,17 +76,92 @@ class DataLoader:
         self.tm_columns = []
         self.em_columns = []
         
+        # Subject x method matrices (built in DataIntegration)
+        self.tm_matrix = None
+        self.em_matrix = None
+        
         # Valid subjects
         self.valid_subjects = set()
+        self.subject_names = {}  # Subject_ID -> Subject_Name (from the PPGD/PPDG sheets)
+        
+        # Source loading
+        self.parallel_load = parallel_load
+        self.max_workers = max_workers
+        self.load_timings = {}
+        self._prefetched = {}
+        
+        # Input validation index (built from self.df on first use). Code that replaces self.df or
+        # edits its key columns must call invalidate_option_index()
+        self.option_index = None
+        self.suggestion_index = None
+
+    def prefetch_sources(self):
+        """Đọc đồng thời tất cả workbook trong DATA_FILES bằng process pool.
+
+        Workbook đã có trong Excel cache được đọc trực tiếp (chỉ vài ms); các workbook
+        còn lại được parse song song. Kết quả được giữ lại cho các hàm load_* phía sau.
+        """
+        if not self.parallel_load:
+            return
+        start = time.perf_counter()
+        cold = {key: path for key, path in DATA_FILES.items() if not is_cache_fresh(path, **source_read_options(key))}
+        
+        workers = self.max_workers or min(len(cold), os.cpu_count() or 1)
+        if len(cold) > 1 and workers > 1:
+            print(f"Reading {len(cold)} workbooks in parallel ({workers} workers)...")
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(read_source_file, path, **source_read_options(key)): key for key, path in cold.items()}
+                for future in as_completed(futures):
+                    key = futures[future]
+                    try:
+                        self._prefetched[key] = future.result()
+                    except BrokenProcessPool:
+                        # Pool không dùng được: đọc lại tuần tự bên dưới
+                        pass
+                    except Exception as e:
+                        # Lỗi được báo lại khi hàm load_* tương ứng yêu cầu file này
+                        self._prefetched[key] = e
+        
+        for key, path in DATA_FILES.items():
+            if key not in self._prefetched:
+                try:
+                    self._prefetched[key] = read_source_file(path, **source_read_options(key))
+                except Exception as e:
+                    self._prefetched[key] = e
+        
+        self.report_load_timings(time.perf_counter() - start)
+
+    def report_load_timings(self, wall_time=None):
+        """In thời gian đọc từng workbook"""
+        print("Workbook read times:")
+        for key, path in DATA_FILES.items():
+            entry = self._prefetched.get(key)
+            if isinstance(entry, tuple):
+                df, elapsed = entry
+                print(f"  {key:20} {elapsed:7.2f}s  {len(df):7} rows  {path}")
+            elif entry is not None:
+                print(f"  {key:20} {'failed':>8}  {entry}")
+        if wall_time is not None:
+            print(f"  {'total (wall)':20} {wall_time:7.2f}s")
+
+    def _read_source(self, key):
+        """Lấy DataFrame của một nguồn: từ kết quả prefetch nếu có, nếu không thì đọc ngay"""
+        entry = self._prefetched.pop(key, None)
+        if entry is None:
+            entry = read_source_file(DATA_FILES[key], **source_read_options(key))
+        elif isinstance(entry, Exception):
+            raise entry
+        df, self.load_timings[key] = entry
+        return df
 
     def load_main_data(self):
         """Load main data from Excel file"""
         print("Reading data from Excel file...")
-        self.df = pd.read_excel(DATA_FILES['main_data'])
+        self.df = self._read_source('main_data')
         
         # Load teaching and assessment method data
-        self.ppgd_df = pd.read_excel(DATA_FILES['teaching_methods'])
-        self.ppdg_df = pd.read_excel(DATA_FILES['assessment_methods'])
+        self.ppgd_df = self._read_source('teaching_methods')
+        self.ppdg_df = self._read_source('assessment_methods')
         
         # Apply subject replacements
         for df in [self.df, self.ppgd_df, self.ppdg_df]:
@@ -56,6 +172,13 @@ class DataLoader:
         ppdg_subjects = set(self.ppdg_df['Subject_ID'].dropna().astype(str))
         self.valid_subjects = ppgd_subjects.intersection(ppdg_subjects)
         
+        # Subject names for suggestions
+        self.subject_names = {}
+        for df in [self.ppdg_df, self.ppgd_df]:
+            if 'Subject_Name' in df.columns:
+                names = df[['Subject_ID', 'Subject_Name']].dropna()
+                self.subject_names.update(zip(names['Subject_ID'].astype(str), names['Subject_Name'].astype(str)))
+        
         # Handle special case: INF0263 equivalent to INF0153 and INF0263
         if 'INF0263' in self.valid_subjects:
             self.valid_subjects.add('INF0153')
@@ -65,6 +188,7 @@ class DataLoader:
         
         # Map INF0153 to INF0263
         self.df.loc[self.df['Subject_ID'] == 'INF0153', 'Subject_ID'] = 'INF0263'
+        self.invalidate_option_index()
         
         print(f"Số môn hợp lệ: {len(self.valid_subjects)}")
 
@@ -72,7 +196,7 @@ class DataLoader:
         """Load demographic data"""
         print("Reading demographic data from nhankhau.xlsx...")
         try:
-            self.nhankhau_df = pd.read_excel(DATA_FILES['demographic'])
+            self.nhankhau_df = self._read_source('demographic')
             print(f"Successfully loaded demographic data with {len(self.nhankhau_df)} students")
             
             # Normalize Student_ID column in demographic file
@@ -106,7 +230,7 @@ class DataLoader:
         """Load conduct score data"""
         print("Integrating conduct score data...")
         try:
-            self.conduct_df = pd.read_excel(DATA_FILES['conduct'])
+            self.conduct_df = self._read_source('conduct')
             print(f"Successfully loaded conduct data with {len(self.conduct_df)} records")
         except Exception as e:
             print(f"Warning: Could not load conduct data: {e}")
@@ -115,7 +239,7 @@ class DataLoader:
     def load_self_study_data(self):
         """Load self-study data"""
         try:
-            self.tuhoc_df = pd.read_excel(DATA_FILES['self_study'])
+            self.tuhoc_df = self._read_source('self_study')
             print("Successfully loaded self-study data")
         except Exception as e:
             print(f"Warning: Could not load self-study data: {e}")
@@ -142,10 +266,15 @@ class DataLoader:
         self.df['clo_achieved'] = ((self.df['exam_score_6'] >= 3.5) & 
                             (~self.df['is_absent_exam'])).astype(int)
         
+        # Compact dtypes (categoricals, small ints, float32) and drop raw score columns
+        memory_before = self.df.memory_usage(deep=True, index=False)
+        self.apply_main_schema()
+        
         # Encode categorical variables
-        self.df['student_id_encoded'] = self.le_student_id.fit_transform(self.df['Student_ID'])
-        self.df['lecturer_encoded'] = self.le_lecturer.fit_transform(self.df['Lecturer_Name'])
-        self.df['subject_encoded'] = self.le_subject.fit_transform(self.df['Subject_ID'])
+        self.df['student_id_encoded'] = self.encode_column(self.le_student_id, 'Student_ID')
+        self.df['lecturer_encoded'] = self.encode_column(self.le_lecturer, 'Lecturer_Name')
+        self.df['subject_encoded'] = self.encode_column(self.le_subject, 'Subject_ID')
+        self.report_memory_usage(memory_before)
         
         # Initialize feature names
         self.feature_names = ['student_id_encoded', 'lecturer_encoded', 'subject_encoded']
@@ -156,41 +285,157 @@ class DataLoader:
         print(f"Number of students who achieved CLO: {sum(self.df['clo_achieved'] == 1)}")
         print(f"Number of students who did not achieve CLO: {sum(self.df['clo_achieved'] == 0)}")
 
+    def apply_main_schema(self, schema=MAIN_DATA_SCHEMA):
+        """Áp dụng schema kiểu dữ liệu gọn cho self.df (chỉ các cột có trong dữ liệu)"""
+        df = self.df.drop(columns=[col for col in schema.get('drop', []) if col in self.df.columns])
+        for col in schema.get('category', []):
+            if col in df.columns:
+                df[col] = to_string_category(df[col])
+        for dtype in ('int8', 'int16', 'int32'):
+            for col in schema.get(dtype, []):
+                if col in df.columns:
+                    df[col] = self._small_int(df[col], dtype)
+        for col in schema.get('float32', []):
+            if col in df.columns:
+                df[col] = df[col].astype(np.float32)
+        self.df = df
+        self.invalidate_option_index()
+
+    @staticmethod
+    def _small_int(series, dtype):
+        """Ép sang số nguyên nhỏ nếu không mất thông tin, nếu không thì dùng categorical chuỗi"""
+        numeric = pd.to_numeric(series, errors='coerce')
+        info = np.iinfo(dtype)
+        if numeric.notna().all() and (numeric % 1 == 0).all() and numeric.between(info.min, info.max).all():
+            return numeric.astype(dtype)
+        return to_string_category(series)
+
+    def encode_column(self, le, col):
+        """LabelEncoder cho một cột; cột categorical dùng luôn mã category (category đã sắp xếp)"""
+        values = self.df[col]
+        if isinstance(values.dtype, pd.CategoricalDtype) and not values.isna().any():
+            values = values.cat.remove_unused_categories()
+            le.fit(values.cat.categories)
+            return values.cat.codes.astype(np.int32)
+        return le.fit_transform(values)
+
+    def extend_encoders(self, previous_encoders):
+        """Dùng lại các LabelEncoder đã lưu (mã cũ giữ nguyên, giá trị mới được thêm vào cuối)
+        và ánh xạ lại các cột *_encoded của self.df sang mã đó"""
+        for col, name in self.ENCODED_COLUMNS.items():
+            previous = previous_encoders.get(name)
+            current = getattr(self, name)
+            if previous is None or not hasattr(previous, 'classes_'):
+                continue
+            if not hasattr(current, 'classes_') or col not in self.df.columns:
+                setattr(self, name, previous)
+                continue
+            known = set(previous.classes_)
+            added = [value for value in current.classes_ if value not in known]
+            extended = LabelEncoder()
+            extended.classes_ = np.concatenate([np.asarray(previous.classes_, dtype=object),
+                                                np.asarray(added, dtype=object)])
+            mapping = pd.Index(extended.classes_).get_indexer(current.classes_)
+            self.df[col] = mapping[self.df[col].to_numpy()].astype(self.df[col].dtype)
+            setattr(self, name, extended)
+            if added:
+                print(f"Extended {name} with {len(added)} new values")
+        self.invalidate_option_index()
+    
+    def report_memory_usage(self, before=None):
+        """In bộ nhớ từng cột của self.df (kèm kích thước trước khi áp dụng schema nếu có)"""
+        usage = self.df.memory_usage(deep=True, index=False)
+        print("Memory usage per column:")
+        for col, nbytes in usage.items():
+            line = f"  {col:25} {str(self.df[col].dtype):10} {nbytes / 1024:10.1f} KiB"
+            if before is not None and col in before:
+                line += f"  (was {before[col] / 1024:.1f} KiB)"
+            print(line)
+        if before is not None:
+            print(f"  {'total':25} {'':10} {usage.sum() / 1024:10.1f} KiB  (was {before.sum() / 1024:.1f} KiB, "
+                  f"{before.sum() / max(usage.sum(), 1):.1f}x smaller)")
+        else:
+            print(f"  {'total':25} {'':10} {usage.sum() / 1024:10.1f} KiB")
+
+    def invalidate_option_index(self):
+        """Bỏ chỉ mục kiểm tra đầu vào (dựng lại ở lần dùng sau); gọi khi self.df được thay hoặc sửa cột khóa"""
+        self.option_index = None
+        self.suggestion_index = None
+
+    def get_option_index(self):
+        """{input_type: (set giá trị, danh sách đã sắp xếp)} của các cột khóa.
+
+        Dựng một lần từ self.df (đến khi invalidate_option_index được gọi), cùng chỉ mục n-gram
+        gợi ý cho giảng viên và môn học (mã + tên môn) trong self.suggestion_index.
+        """
+        if self.option_index is None:
+            self.option_index = {}
+            for input_type, column in self.OPTION_COLUMNS.items():
+                values = sorted(str(v) for v in self.df[column].dropna().unique())
+                self.option_index[input_type] = (frozenset(values), values)
+            subjects = self.option_index['subject_id'][1]
+            self.suggestion_index = {
+                'lecturer': SuggestionIndex(self.option_index['lecturer'][1]),
+                'subject_id': SuggestionIndex(subjects, {s: [self.subject_names[s]] for s in subjects
+                                                         if s in self.subject_names})
+            }
+        return self.option_index
+
     def get_available_options(self):
         """Get available options for input validation"""
+        index = self.get_option_index()
         return {
-            'student_id_list': sorted(self.df['Student_ID'].dropna().unique().tolist()),
-            'lecturer_list': sorted(self.df['Lecturer_Name'].dropna().unique().tolist()),
-            'subject_list': sorted(self.df['Subject_ID'].dropna().unique().tolist())
+            'student_id_list': list(index['student_id'][1]),
+            'lecturer_list': list(index['lecturer'][1]),
+            'subject_list': list(index['subject_id'][1])
         }
 
+    def suggest_options(self, input_type, value, limit=5):
+        """Gợi ý giá trị hợp lệ cho ``value``.
+
+        Giảng viên/môn học: ứng viên gần đúng từ chỉ mục n-gram (không phân biệt dấu, hoa thường;
+        môn học khớp cả theo tên). Còn lại, hoặc khi không có ứng viên: các giá trị có chung tiền tố
+        dài nhất (tìm nhị phân trên danh sách đã sắp xếp), cuối cùng là ``limit`` giá trị đầu tiên.
+        """
+        values = self.get_option_index()[input_type][1]
+        if input_type in self.suggestion_index:
+            matches = self.suggestion_index[input_type].suggest(value, limit)
+            if matches:
+                return matches
+        value = str(value).strip()
+        for length in range(len(value), 0, -1):
+            prefix = value[:length]
+            start = bisect_left(values, prefix)
+            matches = [v for v in values[start:start + limit] if v.startswith(prefix)]
+            if matches:
+                return matches
+        return values[:limit]
+
+    def resolve_input(self, input_type, value):
+        """Giá trị hợp lệ ứng với ``value``: chính nó, hoặc giá trị duy nhất trùng khi bỏ dấu/hoa thường
+        (môn học: cả theo tên môn). None nếu không xác định được."""
+        if str(value) in self.get_option_index()[input_type][0]:
+            return str(value)
+        index = self.suggestion_index.get(input_type)
+        return index.lookup(value) if index is not None else None
+
     def validate_input(self, input_type, value):
         """Validate input against available options"""
-        options = self.get_available_options()
-        
-        # Map input_type to correct key
-        key_mapping = {
-            'student_id': 'student_id_list',
-            'lecturer': 'lecturer_list', 
-            'subject_id': 'subject_list'
-        }
-        
-        key = key_mapping.get(input_type, f'{input_type}_list')
-        valid_list = [str(v) for v in options[key]]
+        valid_values = self.get_option_index()[input_type][0]
         
-        if str(value) not in valid_list:
+        if str(value) not in valid_values:
             # Đặc biệt xử lý cho giảng viên mới
             if input_type == 'lecturer':
                 print(f"\n⚠️ Giảng viên mới: {value}")
+                similar = self.suggestion_index['lecturer'].suggest(value, 3, cutoff=0.5)
+                if similar:
+                    print(f"💡 Giảng viên có tên gần giống: {', '.join(similar)}")
                 print("✅ Cho phép giảng viên mới - sẽ được phân tích đặc biệt")
                 return True  # Cho phép giảng viên mới
             
             print(f"\n⚠️ Error: {input_type} not found: {value}")
             print("Suggestions: Please choose one of the following values:")
-            if input_type == 'student_id':
-                print(", ".join(valid_list[:10]))
-            else:
-                print(", ".join(valid_list[:5]))
+            print(", ".join(self.suggest_options(input_type, value, 10 if input_type == 'student_id' else 5)))
             return False
         return True
 
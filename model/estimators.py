@@ -0,0 +1,52 @@
+from sklearn.ensemble import (
+    RandomForestClassifier, ExtraTreesClassifier,
+    GradientBoostingClassifier, HistGradientBoostingClassifier
+)
+
+# Estimator backends selectable from config: name -> (estimator class, display name)
+ESTIMATOR_BACKENDS = {
+    'random_forest': (RandomForestClassifier, 'RandomForest'),
+    'extra_trees': (ExtraTreesClassifier, 'ExtraTrees'),
+    'gradient_boosting': (GradientBoostingClassifier, 'GradientBoosting'),
+    'hist_gradient_boosting': (HistGradientBoostingClassifier, 'HistGradientBoosting')
+}
+
+
+def register_backend(name, estimator_class, label=None):
+    """Đăng ký thêm một backend (lớp estimator kiểu sklearn) dưới tên ``name``"""
+    ESTIMATOR_BACKENDS[name] = (estimator_class, label or estimator_class.__name__)
+
+
+def backend_label(backend):
+    """Tên hiển thị của một backend, ví dụ 'hist_gradient_boosting' -> 'HistGradientBoosting'"""
+    return _backend(backend)[1]
+
+
+def make_estimator(backend, params=None, **overrides):
+    """Tạo estimator chưa fit cho ``backend`` với tham số ``params`` (dict) và ``overrides``"""
+    estimator_class = _backend(backend)[0]
+    return estimator_class(**{**(params or {}), **overrides})
+
+
+def grow_estimator(model, X, y, growth=0.25):
+    """Thêm cây/stage vào estimator đã fit bằng warm_start, chỉ fit trên dữ liệu mới X, y.
+
+    Số cây (n_estimators, hoặc max_iter với HistGradientBoosting) tăng thêm ``growth`` lần
+    kích thước hiện tại (ít nhất 1). Trả về số cây/stage đã thêm.
+    """
+    params = model.get_params()
+    if 'warm_start' not in params:
+        raise ValueError(f"{type(model).__name__} does not support warm_start")
+    size_param = 'n_estimators' if 'n_estimators' in params else 'max_iter'
+    added = max(1, int(round(params[size_param] * growth)))
+    model.set_params(warm_start=True, **{size_param: params[size_param] + added})
+    model.fit(X, y)
+    model.set_params(warm_start=False)
+    return added
+
+
+def _backend(backend):
+    try:
+        return ESTIMATOR_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown estimator backend '{backend}'. Available: {sorted(ESTIMATOR_BACKENDS)}") from None
@@ -0,0 +1,115 @@
+import os
+import json
+import hashlib
+import pandas as pd
+from .config import CACHE_DIR, EXCEL_CACHE_ENABLED
+from .excel_stream import read_excel_columns
+
+
+def file_fingerprint(path, content_hash=True):
+    """Fingerprint of a file: absolute path, size, mtime and (optionally) SHA-256 of its content"""
+    stat = os.stat(path)
+    fingerprint = {
+        'path': os.path.abspath(path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns
+    }
+    if content_hash:
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                sha.update(block)
+        fingerprint['sha256'] = sha.hexdigest()
+    return fingerprint
+
+
+def _cache_paths(path, read_kwargs):
+    """Cache file paths for one (workbook, read options) pair"""
+    key_source = json.dumps([os.path.abspath(path), sorted(read_kwargs.items())], default=str, ensure_ascii=False)
+    key = hashlib.sha1(key_source.encode('utf-8')).hexdigest()
+    cache_dir = os.path.join(CACHE_DIR, 'excel')
+    return os.path.join(cache_dir, f'{key}.json'), os.path.join(cache_dir, f'{key}.pkl')
+
+
+def _atomic_write(target, write):
+    """Write to a temporary file then rename, so concurrent readers never see partial files"""
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp_path = f'{target}.{os.getpid()}.tmp'
+    write(tmp_path)
+    os.replace(tmp_path, target)
+
+
+def is_cache_fresh(path, **read_kwargs):
+    """True if a cached frame exists and the workbook's size/mtime are unchanged (no hashing)"""
+    if not EXCEL_CACHE_ENABLED or not os.path.exists(path):
+        return False
+    meta_path, data_path = _cache_paths(path, read_kwargs)
+    if not (os.path.exists(meta_path) and os.path.exists(data_path)):
+        return False
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return False
+    current = file_fingerprint(path, content_hash=False)
+    return cached['size'] == current['size'] and cached['mtime_ns'] == current['mtime_ns']
+
+
+def _read_excel(path, **read_kwargs):
+    """Parse a sheet: streaming column-projected reader when ``columns`` is given, else pd.read_excel"""
+    if 'columns' in read_kwargs:
+        return read_excel_columns(path, **read_kwargs)
+    return pd.read_excel(path, **read_kwargs)
+
+
+def read_excel_cached(path, **read_kwargs):
+    """pd.read_excel with a transparent on-disk cache of the parsed sheet.
+
+    Passing ``columns`` (and optionally ``dtypes``) reads only those columns with the
+    streaming reader in excel_stream instead of materializing the whole workbook.
+
+    Entries are validated against the workbook's size and mtime; if those changed the
+    content hash decides whether the cached frame is still valid. Warm reads load the
+    pickled frame (numpy column blocks) and never touch openpyxl.
+    """
+    if not EXCEL_CACHE_ENABLED:
+        return _read_excel(path, **read_kwargs)
+
+    meta_path, data_path = _cache_paths(path, read_kwargs)
+    current = file_fingerprint(path, content_hash=False)
+    cached = None
+    if os.path.exists(meta_path) and os.path.exists(data_path):
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            cached = None
+
+    if cached is not None:
+        unchanged = cached['size'] == current['size'] and cached['mtime_ns'] == current['mtime_ns']
+        if not unchanged:
+            # Timestamp changed: only the content hash can tell whether the workbook really changed
+            current = file_fingerprint(path)
+            unchanged = cached.get('sha256') == current['sha256']
+            if unchanged:
+                _atomic_write(meta_path, lambda p: _write_json(p, current))
+        if unchanged:
+            try:
+                return pd.read_pickle(data_path)
+            except Exception as e:
+                print(f"Warning: Could not read Excel cache for {path}: {e}")
+
+    df = _read_excel(path, **read_kwargs)
+    if 'sha256' not in current:
+        current = file_fingerprint(path)
+    try:
+        _atomic_write(data_path, lambda p: df.to_pickle(p))
+        _atomic_write(meta_path, lambda p: _write_json(p, current))
+    except OSError as e:
+        print(f"Warning: Could not write Excel cache for {path}: {e}")
+    return df
+
+
+def _write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
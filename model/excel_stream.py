@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.cell.cell import ERROR_CODES
+from pandas.io.parsers import TextParser
+from .config import EXCEL_CHUNK_SIZE
+
+
+def _cell_value(value):
+    """Chuẩn hóa giá trị ô giống pandas.read_excel: số thực nguyên -> int, ô lỗi (#VALUE!...) -> NaN"""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str) and value in ERROR_CODES:
+        return np.nan
+    return value
+
+
+def _buffer_dtype(dtype):
+    """Kiểu mảng numpy dùng để ghép một cột khai báo kiểu ``dtype`` ('str'/hàm chuyển đổi: object)"""
+    if dtype == 'float':
+        return np.dtype(np.float64)
+    if dtype == 'str' or dtype is str or (callable(dtype) and not isinstance(dtype, type)):
+        return np.dtype(object)
+    try:
+        return np.dtype(dtype)
+    except TypeError:
+        return np.dtype(object)
+
+
+def _is_extension_dtype(dtype):
+    """dtype pandas không có kiểu numpy tương ứng ('Int64', 'category'...): ghép dạng object rồi ép kiểu ở cuối"""
+    return (dtype not in ('str', 'float') and not callable(dtype) and dtype is not object
+            and _buffer_dtype(dtype) == object)
+
+
+def _coerce_chunk(rows, names, dtypes):
+    """Tạo DataFrame cho một chunk và ép kiểu các cột được khai báo.
+
+    Dùng cùng TextParser với pandas.read_excel nên chuỗi rỗng/'NA'... được nhận là NaN giống
+    khi đọc cả file. Các cột khai báo được parse dạng object rồi ép kiểu từ giá trị ô gốc, nên
+    kiểu của chúng không phụ thuộc vào việc pandas suy luận trên từng chunk.
+    """
+    declared = {col: object for col in names if col in dtypes}
+    chunk = TextParser(rows, header=None, names=names, dtype=declared).read()
+    for col, dtype in dtypes.items():
+        if col not in chunk.columns or dtype is object:
+            continue
+        if dtype == 'str':
+            chunk[col] = chunk[col].where(chunk[col].isna(), chunk[col].astype(str))
+        elif dtype == 'float':
+            chunk[col] = pd.to_numeric(chunk[col], errors='coerce')
+        elif callable(dtype):
+            chunk[col] = chunk[col].map(dtype)
+        else:
+            chunk[col] = chunk[col].astype(dtype)
+    return chunk
+
+
+def _iter_row_chunks(path, columns, sheet_name, chunk_size):
+    """Đọc sheet theo luồng, trả về (tên cột, số dòng dự kiến, chunk các dòng giá trị ô)"""
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[sheet_name] if isinstance(sheet_name, int) else workbook[sheet_name]
+        # Dimension of the sheet (None if the workbook does not record it); an upper bound of the data rows
+        expected_rows = max(sheet.max_row - 1, 0) if sheet.max_row else None
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        names = [str(h) if h is not None else f'Unnamed: {i}' for i, h in enumerate(header)]
+        if columns is None:
+            wanted = list(range(len(names)))
+        else:
+            positions = {}
+            for i, name in enumerate(names):
+                positions.setdefault(name, i)
+            wanted = [positions[col] for col in columns if col in positions]
+        wanted_names = [names[i] for i in wanted]
+
+        data = []
+        for row in rows:
+            # Bỏ dòng trống như pandas (skip_blank_lines)
+            if all(value is None or value == '' for value in row):
+                continue
+            data.append([_cell_value(row[i]) if i < len(row) else np.nan for i in wanted])
+            if len(data) == chunk_size:
+                yield wanted_names, expected_rows, data
+                data = []
+        if data:
+            yield wanted_names, expected_rows, data
+    finally:
+        workbook.close()
+
+
+def iter_excel_chunks(path, columns=None, dtypes=None, sheet_name=0, chunk_size=EXCEL_CHUNK_SIZE):
+    """Đọc một sheet Excel theo luồng (openpyxl read_only/values_only), trả về từng chunk DataFrame.
+
+    Chỉ giữ các cột trong ``columns`` (cột không có trong file được bỏ qua), ép kiểu theo
+    ``dtypes`` ('str', 'float', dtype pandas hoặc hàm chuyển đổi) ngay khi mỗi chunk đầy,
+    nên bộ nhớ chỉ phụ thuộc vào chunk_size chứ không phụ thuộc kích thước file.
+    """
+    dtypes = dtypes or {}
+    for names, _, rows in _iter_row_chunks(path, columns, sheet_name, chunk_size):
+        yield _coerce_chunk(rows, names, dtypes)
+
+
+def read_excel_columns(path, columns=None, dtypes=None, sheet_name=0, chunk_size=EXCEL_CHUNK_SIZE):
+    """Đọc các cột cần thiết của một sheet Excel theo chunk vào các mảng có kiểu cố định.
+
+    Mỗi chunk được ép kiểu theo ``dtypes`` rồi chép vào mảng cấp phát trước theo kích thước
+    sheet (tăng gấp đôi nếu sheet không ghi kích thước), nên ngoài kết quả chỉ có một chunk
+    nằm trong bộ nhớ. Cột không khai báo kiểu được ghép dạng object và suy luận kiểu một lần
+    trên cả cột như pandas.read_excel.
+    """
+    dtypes = dtypes or {}
+    names, buffers, size = None, None, 0
+    for chunk_names, expected_rows, rows in _iter_row_chunks(path, columns, sheet_name, chunk_size):
+        # Undeclared columns stay raw (object) until the whole column is known
+        chunk = _coerce_chunk(rows, chunk_names, {**{col: object for col in chunk_names}, **dtypes})
+        del rows
+        if buffers is None:
+            names = chunk_names
+            capacity = max(expected_rows or 0, len(chunk))
+            buffers = [np.empty(capacity, dtype=_buffer_dtype(dtypes.get(col, object))) for col in names]
+        if size + len(chunk) > len(buffers[0]):
+            capacity = max(2 * len(buffers[0]), size + len(chunk))
+            buffers = [np.resize(buffer, capacity) for buffer in buffers]
+        for buffer, col in zip(buffers, names):
+            buffer[size:size + len(chunk)] = chunk[col].to_numpy(dtype=buffer.dtype)
+        size += len(chunk)
+    if buffers is None:
+        return pd.DataFrame(columns=columns or [])
+
+    frame = {}
+    for buffer, col in zip(buffers, names):
+        values = buffer[:size]
+        if col not in dtypes:
+            frame[col] = TextParser([[value] for value in values], header=None, names=[col]).read()[col]
+        elif _is_extension_dtype(dtypes[col]):
+            # Assembled as object, converted once (e.g. 'Int64')
+            frame[col] = pd.Series(values, name=col).astype(dtypes[col])
+        else:
+            frame[col] = pd.Series(values, name=col, copy=False)
+    return pd.DataFrame(frame, columns=names, copy=False)
@@ -11,7 +11,7 @@ class FeatureEngineering:
         print("Adding student history features...")
         
         # Calculate student history features
-        student_history = self.df.groupby('Student_ID').agg({
+        student_history = self.df.groupby('Student_ID', observed=True).agg({
             'passed': ['count', 'sum', 'mean'],
             'clo_achieved': ['sum', 'mean'],
             'exam_score_6': ['mean', 'std', 'min', 'max'],
@@ -48,32 +48,26 @@ class FeatureEngineering:
         """Add advanced student features"""
         print("Adding advanced student features...")
         
-        # Calculate recent performance (last 3 subjects)
-        def recent_performance(student_data):
-            if len(student_data) <= 3:
-                return student_data['exam_score_6'].mean()
-            return student_data.sort_values('year').tail(3)['exam_score_6'].mean()
-        
-        recent_scores = self.df.groupby('Student_ID').apply(recent_performance).reset_index()
-        recent_scores.columns = ['Student_ID', 'recent_avg_score']
-        
-        # Calculate improvement trend
-        def improvement_trend(student_data):
-            if len(student_data) < 2:
-                return 0
-            sorted_data = student_data.sort_values('year')
-            if len(sorted_data) >= 2:
-                recent = sorted_data.tail(2)['exam_score_6'].mean()
-                earlier = sorted_data.head(len(sorted_data)-2)['exam_score_6'].mean()
-                return recent - earlier
-            return 0
-        
-        improvement_trends = self.df.groupby('Student_ID').apply(improvement_trend).reset_index()
-        improvement_trends.columns = ['Student_ID', 'improvement_trend']
+        # Sort once by (Student_ID, year); position counted from each student's latest row
+        ordered = self.df[['Student_ID', 'year', 'exam_score_6']].sort_values(['Student_ID', 'year'], kind='mergesort')
+        from_end = ordered.groupby('Student_ID', observed=True).cumcount(ascending=False).values
+        
+        # Recent performance: mean of the last 3 subjects (all subjects if 3 or fewer)
+        recent_avg = ordered[from_end < 3].groupby('Student_ID', observed=True)['exam_score_6'].mean()
+        
+        # Improvement trend: mean of the last 2 subjects minus mean of the earlier ones
+        counts = ordered.groupby('Student_ID', observed=True).size()
+        last_two = ordered[from_end < 2].groupby('Student_ID', observed=True)['exam_score_6'].mean()
+        earlier = ordered[from_end >= 2].groupby('Student_ID', observed=True)['exam_score_6'].mean().reindex(counts.index)
+        trend = (last_two - earlier).where(counts >= 2, 0)
+        
+        student_features = pd.DataFrame({
+            'recent_avg_score': recent_avg,
+            'improvement_trend': trend
+        }).rename_axis('Student_ID').reset_index()
         
         # Merge features
-        self.df = pd.merge(self.df, recent_scores, on='Student_ID', how='left')
-        self.df = pd.merge(self.df, improvement_trends, on='Student_ID', how='left')
+        self.df = pd.merge(self.df, student_features, on='Student_ID', how='left')
         
         # Add to feature list
         advanced_features = ['recent_avg_score', 'improvement_trend']
@@ -84,35 +78,25 @@ class FeatureEngineering:
         """Add personalized features based on student characteristics"""
         print("Adding personalized features...")
         
-        def recent_pass_count(row):
-            student_data = self.df[self.df['Student_ID'] == row['Student_ID']]
-            recent_data = student_data.sort_values('year').tail(3)
-            return recent_data['passed'].sum()
-        
-        def recent_fail_count(row):
-            student_data = self.df[self.df['Student_ID'] == row['Student_ID']]
-            recent_data = student_data.sort_values('year').tail(3)
-            return (recent_data['passed'] == 0).sum()
-        
-        def recent_avg_score(row):
-            student_data = self.df[self.df['Student_ID'] == row['Student_ID']]
-            recent_data = student_data.sort_values('year').tail(3)
-            return recent_data['exam_score_6'].mean()
-        
-        def num_with_lecturer(row):
-            return len(self.df[(self.df['Student_ID'] == row['Student_ID']) & 
-                             (self.df['Lecturer_Name'] == row['Lecturer_Name'])])
-        
-        def num_in_group(row):
-            return len(self.df[(self.df['Student_ID'] == row['Student_ID']) & 
-                             (self.df['Subject_ID'] == row['Subject_ID'])])
-        
-        # Apply functions
-        self.df['recent_pass_count'] = self.df.apply(recent_pass_count, axis=1)
-        self.df['recent_fail_count'] = self.df.apply(recent_fail_count, axis=1)
-        self.df['recent_avg_score'] = self.df.apply(recent_avg_score, axis=1)
-        self.df['num_with_lecturer'] = self.df.apply(num_with_lecturer, axis=1)
-        self.df['num_in_group'] = self.df.apply(num_in_group, axis=1)
+        # Sort once by (Student_ID, year); the last 3 rows of each student are the recent ones
+        ordered = self.df.sort_values(['Student_ID', 'year'], kind='mergesort')
+        recent_mask = ordered.groupby('Student_ID', observed=True).cumcount(ascending=False) < 3
+        recent = ordered.loc[recent_mask, ['Student_ID', 'passed', 'exam_score_6']]
+        recent = recent.assign(failed=(recent['passed'] == 0).astype(int))
+        recent_stats = recent.groupby('Student_ID', observed=True).agg(
+            recent_pass_count=('passed', 'sum'),
+            recent_fail_count=('failed', 'sum'),
+            recent_avg_score=('exam_score_6', 'mean')
+        )
+        
+        student_ids = self.df['Student_ID']
+        self.df['recent_pass_count'] = student_ids.map(recent_stats['recent_pass_count']).fillna(0).astype(int)
+        self.df['recent_fail_count'] = student_ids.map(recent_stats['recent_fail_count']).fillna(0).astype(int)
+        self.df['recent_avg_score'] = student_ids.map(recent_stats['recent_avg_score'])
+        
+        # Group sizes over precomputed keys (rows with a missing key count 0, as before)
+        self.df['num_with_lecturer'] = self.df.groupby(['Student_ID', 'Lecturer_Name'], observed=True)['Student_ID'].transform('size').fillna(0).astype(int)
+        self.df['num_in_group'] = self.df.groupby(['Student_ID', 'Subject_ID'], observed=True)['Student_ID'].transform('size').fillna(0).astype(int)
         
         # Add to feature list
         personalized_features = ['recent_pass_count', 'recent_fail_count', 'num_with_lecturer', 'num_in_group']
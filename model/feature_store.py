@@ -0,0 +1,117 @@
+import os
+import glob
+import json
+import pickle
+import hashlib
+from . import config
+from .config import DATA_FILES, CACHE_DIR, FEATURE_STORE_VERSION
+from .excel_cache import file_fingerprint
+
+# Modules whose code determines the engineered feature matrix
+FEATURE_CODE_MODULES = [
+    'utils.py', 'excel_cache.py', 'excel_stream.py', 'data_loader.py',
+    'data_integration.py', 'feature_engineering.py'
+]
+# config.py settings the feature matrix depends on (other settings do not invalidate snapshots)
+FEATURE_CONFIG = ['DATA_FILES', 'SOURCE_COLUMNS', 'SUBJECT_REPLACE', 'MAIN_DATA_SCHEMA']
+
+# DataLoader state produced by CLOPredictor.load_and_prepare_data and used afterwards
+STATE_ATTRIBUTES = [
+    'df', 'feature_names', 'demographic_features', 'conduct_features',
+    'tm_columns', 'em_columns', 'tm_matrix', 'em_matrix', 'valid_subjects', 'subject_names',
+    'gender_col', 'religion_col', 'birth_place_col', 'ethnicity_col'
+]
+
+
+def input_fingerprint():
+    """Content fingerprint of every workbook in DATA_FILES (None for missing files)"""
+    fingerprint = {}
+    for key, path in sorted(DATA_FILES.items()):
+        if os.path.exists(path):
+            info = file_fingerprint(path)
+            fingerprint[key] = {'size': info['size'], 'sha256': info['sha256']}
+        else:
+            fingerprint[key] = None
+    return fingerprint
+
+
+def config_fingerprint(names):
+    """Hash of the values of the given config.py settings"""
+    values = {name: getattr(config, name) for name in names}
+    return hashlib.sha256(json.dumps(values, sort_keys=True, default=repr).encode('utf-8')).hexdigest()
+
+
+def feature_code_version():
+    """Hash of FEATURE_STORE_VERSION, the FEATURE_CONFIG settings and the source of the feature pipeline modules"""
+    sha = hashlib.sha256(str(FEATURE_STORE_VERSION).encode('utf-8'))
+    sha.update(config_fingerprint(FEATURE_CONFIG).encode('utf-8'))
+    module_dir = os.path.dirname(os.path.abspath(__file__))
+    for name in FEATURE_CODE_MODULES:
+        with open(os.path.join(module_dir, name), 'rb') as f:
+            sha.update(f.read())
+    return sha.hexdigest()
+
+
+def feature_store_key():
+    """Snapshot key: fingerprint of the input files plus the feature code version"""
+    key_source = json.dumps({
+        'inputs': input_fingerprint(),
+        'code': feature_code_version()
+    }, sort_keys=True)
+    return hashlib.sha256(key_source.encode('utf-8')).hexdigest()[:16]
+
+
+def _store_dir():
+    return os.path.join(CACHE_DIR, 'feature_store')
+
+
+def save_feature_store(data_loader, key=None):
+    """Lưu ma trận đặc trưng cuối cùng, feature_names và các LabelEncoder của DataLoader"""
+    key = key or feature_store_key()
+    state = {name: getattr(data_loader, name) for name in STATE_ATTRIBUTES}
+    state['encoders'] = {name: value for name, value in vars(data_loader).items() if name.startswith('le_')}
+    snapshot = {'key': key, 'version': FEATURE_STORE_VERSION, 'state': state}
+
+    store_dir = _store_dir()
+    os.makedirs(store_dir, exist_ok=True)
+    path = os.path.join(store_dir, f'features_{key}.pkl')
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+    # Chỉ giữ snapshot mới nhất
+    for old_path in glob.glob(os.path.join(store_dir, 'features_*.pkl')):
+        if old_path != path:
+            os.remove(old_path)
+    print(f"Saved feature store snapshot: {path}")
+    return path
+
+
+def load_feature_store(data_loader, key=None):
+    """Nạp snapshot vào DataLoader nếu khớp key hiện tại. Trả về True nếu thành công"""
+    try:
+        key = key or feature_store_key()
+    except OSError as e:
+        print(f"Warning: Could not fingerprint feature inputs: {e}")
+        return False
+    path = os.path.join(_store_dir(), f'features_{key}.pkl')
+    if not os.path.exists(path):
+        return False
+    try:
+        with open(path, 'rb') as f:
+            snapshot = pickle.load(f)
+    except Exception as e:
+        print(f"Warning: Could not read feature store snapshot {path}: {e}")
+        return False
+    if snapshot.get('key') != key or snapshot.get('version') != FEATURE_STORE_VERSION:
+        return False
+
+    state = snapshot['state']
+    for name, encoder in state.pop('encoders').items():
+        setattr(data_loader, name, encoder)
+    for name, value in state.items():
+        setattr(data_loader, name, value)
+    data_loader.invalidate_option_index()
+    print(f"Loaded feature store snapshot: {path} ({len(data_loader.df)} records, {len(data_loader.feature_names)} features)")
+    return True
@@ -0,0 +1,127 @@
+import os
+import re
+import numpy as np
+import pandas as pd
+try:
+    from .config import DATA_FILES, SUBJECT_REPLACE
+    from .excel_cache import read_excel_cached
+except ImportError:
+    # Chạy trực tiếp dưới dạng script: đọc Excel không qua cache
+    from config import DATA_FILES, SUBJECT_REPLACE
+    read_excel_cached = pd.read_excel
+
+# Canonical method codes, as used by the PPDGIntegration mappings: 'EM11' -> 'EM 11', 'TM 11' -> 'TM11'
+METHOD_CODE_FORMAT = {'EM': 'EM {}', 'TM': 'TM{}'}
+# Method prefix -> DATA_FILES source (EM: PPDG, TM: PPGD)
+METHOD_SOURCES = {'EM': 'assessment_methods', 'TM': 'teaching_methods'}
+
+
+def method_number(code, prefix):
+    """Số thứ tự của mã phương pháp ('EM11', 'EM 11', 'TM 3'...), None nếu không phải mã ``prefix``"""
+    match = re.match(rf'^{prefix}\s*(\d+)$', str(code).strip())
+    return int(match.group(1)) if match else None
+
+
+def canonical_method_code(code):
+    """Dạng chuẩn của mã phương pháp EM/TM (các mã khác giữ nguyên)"""
+    for prefix, fmt in METHOD_CODE_FORMAT.items():
+        number = method_number(code, prefix)
+        if number is not None:
+            return fmt.format(number)
+    return code
+
+
+def canonical_method_columns(df):
+    """Đổi tên các cột EM/TM của bảng PPDG/PPGD sang mã chuẩn"""
+    return df.rename(columns=canonical_method_code)
+
+
+def is_marked(value):
+    """Ô phương pháp có được đánh dấu hay không ('X', 'x' hoặc giá trị không rỗng)"""
+    return value == 'X' or value == 'x' or (pd.notna(value) and str(value).strip() not in ('', 'nan'))
+
+
+class MethodTable:
+    """Bảng môn học -> bitmask phương pháp cho EM (PPDG) và TM (PPGD).
+
+    Bit i của mask ứng với ``codes[prefix][i]`` (mã chuẩn, theo số thứ tự). Khóa là Subject_ID đã
+    áp dụng SUBJECT_REPLACE; tra cứu chấp nhận cả mã cũ.
+    """
+
+    def __init__(self, frames):
+        self.codes = {}
+        self.masks = {}
+        self.subject_names = {}
+        for prefix, df in frames.items():
+            numbers = {col: method_number(col, prefix) for col in df.columns}
+            columns = sorted((col for col, n in numbers.items() if n is not None), key=numbers.get)
+            self.codes[prefix] = [METHOD_CODE_FORMAT[prefix].format(numbers[col]) for col in columns]
+            masks = {}
+            for row in df[['Subject_ID'] + columns].itertuples(index=False, name=None):
+                if pd.isna(row[0]):
+                    continue
+                subject_id = self.subject_key(row[0])
+                if subject_id not in masks:  # First row of a subject wins
+                    masks[subject_id] = sum(1 << i for i, value in enumerate(row[1:]) if is_marked(value))
+            self.masks[prefix] = masks
+            if 'Subject_Name' in df.columns:
+                for subject_id, name in df[['Subject_ID', 'Subject_Name']].dropna().itertuples(index=False, name=None):
+                    self.subject_names.setdefault(self.subject_key(subject_id), str(name))
+
+    @staticmethod
+    def subject_key(subject_id):
+        subject_id = str(subject_id).strip()
+        return SUBJECT_REPLACE.get(subject_id, subject_id)
+
+    def mask(self, subject_id, prefix='EM'):
+        """Bitmask phương pháp của môn học (None nếu môn học không có trong bảng)"""
+        return self.masks[prefix].get(self.subject_key(subject_id))
+
+    def methods(self, subject_id, prefix='EM'):
+        """{mã chuẩn: có sử dụng} của môn học theo thứ tự mã, None nếu không có môn học"""
+        mask = self.mask(subject_id, prefix)
+        if mask is None:
+            return None
+        return {code: bool(mask >> i & 1) for i, code in enumerate(self.codes[prefix])}
+
+    def used(self, subject_id, prefix='EM'):
+        """Danh sách mã chuẩn được sử dụng bởi môn học ([] nếu không có môn học)"""
+        mask = self.mask(subject_id, prefix) or 0
+        return [code for i, code in enumerate(self.codes[prefix]) if mask >> i & 1]
+
+    def frame(self, prefix='EM'):
+        """Bảng môn học x phương pháp dựng từ bitmask: Subject_ID, Subject_Name và một cột 0/1
+        cho mỗi mã chuẩn (1 = có sử dụng), theo thứ tự môn học trong file"""
+        subjects = list(self.masks[prefix])
+        masks = np.fromiter((self.masks[prefix][s] for s in subjects), dtype=np.uint64, count=len(subjects))
+        bits = (masks[:, None] >> np.arange(len(self.codes[prefix]), dtype=np.uint64)) & np.uint64(1)
+        df = pd.DataFrame(bits.astype(np.uint8), columns=self.codes[prefix])
+        df.insert(0, 'Subject_ID', subjects)
+        df.insert(1, 'Subject_Name', [self.subject_names.get(s) for s in subjects])
+        return df
+
+    def subjects_using(self, code):
+        """Các môn học sử dụng một phương pháp (mã EM/TM bất kỳ dạng)"""
+        code = canonical_method_code(code)
+        prefix = code[:2]
+        if prefix not in self.codes or code not in self.codes[prefix]:
+            return []
+        bit = 1 << self.codes[prefix].index(code)
+        return [subject_id for subject_id, mask in self.masks[prefix].items() if mask & bit]
+
+
+# Process-wide cache: (source paths, file size/mtime) -> MethodTable
+_TABLE_CACHE = {}
+
+
+def load_method_table(paths=None):
+    """MethodTable dùng chung trong tiến trình; chỉ đọc lại khi file PPDG/PPGD thay đổi"""
+    paths = paths or {prefix: DATA_FILES[source] for prefix, source in METHOD_SOURCES.items()}
+    stamp = tuple((prefix, os.path.abspath(path), os.stat(path).st_size, os.stat(path).st_mtime_ns)
+                  for prefix, path in sorted(paths.items()))
+    table = _TABLE_CACHE.get(stamp)
+    if table is None:
+        table = MethodTable({prefix: read_excel_cached(path) for prefix, path in paths.items()})
+        _TABLE_CACHE.clear()
+        _TABLE_CACHE[stamp] = table
+    return table
@@ -0,0 +1,132 @@
+import os
+import json
+import pickle
+import hashlib
+from datetime import datetime
+from .config import CLO_MODEL_DIR, MODEL_ARTIFACT_VERSION
+from .feature_store import feature_store_key, feature_code_version, input_fingerprint, config_fingerprint
+
+# Modules whose code determines the trained ensemble
+MODEL_CODE_MODULES = ['model_trainer.py', 'estimators.py']
+# config.py training parameters of the ensemble (serving, profiling and benchmark flags are not part of the key)
+MODEL_CONFIG = ['CLO_BACKENDS', 'BACKEND_PARAMS', 'SEARCH_MODE', 'TERM_COLUMNS']
+
+
+def model_code_version():
+    """Hash of MODEL_ARTIFACT_VERSION, the MODEL_CONFIG training parameters and the source of the training modules"""
+    sha = hashlib.sha256(str(MODEL_ARTIFACT_VERSION).encode('utf-8'))
+    sha.update(config_fingerprint(MODEL_CONFIG).encode('utf-8'))
+    module_dir = os.path.dirname(os.path.abspath(__file__))
+    for name in MODEL_CODE_MODULES:
+        with open(os.path.join(module_dir, name), 'rb') as f:
+            sha.update(f.read())
+    return sha.hexdigest()
+
+
+def model_artifact_key(optimize_params, data_key=None):
+    """Artifact key: data/feature key (see feature_store_key), training code/config and optimize_params"""
+    key_source = json.dumps({
+        'data': data_key or feature_store_key(),
+        'code': model_code_version(),
+        'optimize_params': bool(optimize_params)
+    }, sort_keys=True)
+    return hashlib.sha256(key_source.encode('utf-8')).hexdigest()[:16]
+
+
+def _artifact_paths():
+    return os.path.join(CLO_MODEL_DIR, 'clo_model.pkl'), os.path.join(CLO_MODEL_DIR, 'metadata.pkl')
+
+
+def save_model_artifact(model_trainer, key, training_results=None, optimize_params=False):
+    """Lưu VotingClassifier, feature_names, các LabelEncoder và fingerprint dữ liệu huấn luyện"""
+    data_loader = model_trainer.data_loader
+    model_path, metadata_path = _artifact_paths()
+    artifact = {
+        'key': key,
+        'version': MODEL_ARTIFACT_VERSION,
+        'model': model_trainer.model,
+        'feature_names': list(data_loader.feature_names),
+        'encoders': {name: value for name, value in vars(data_loader).items() if name.startswith('le_')},
+        'data_fingerprint': input_fingerprint(),
+        # Needed to update the model incrementally when new terms are appended
+        'trained_through': model_trainer.trained_through,
+        # Fingerprint of the rows up to the watermark: edits to older terms force a full retrain
+        'history_fingerprint': (model_trainer.history_fingerprint(model_trainer.trained_through)
+                                if model_trainer.trained_through is not None else None),
+        'code_version': model_code_version(),
+        'feature_code_version': feature_code_version(),
+        'optimize_params': bool(optimize_params)
+    }
+    metadata = {
+        'trained_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'model_type': 'clo',
+        'key': key,
+        'num_features': len(artifact['feature_names']),
+        'total_records': len(model_trainer.X),
+        'training_results': training_results or {}
+    }
+    
+    os.makedirs(CLO_MODEL_DIR, exist_ok=True)
+    for path, data in ((model_path, artifact), (metadata_path, metadata)):
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    print(f"Saved CLO model artifact: {model_path}")
+    return model_path
+
+
+def read_model_artifact():
+    """Đọc artifact đã lưu (dict) hoặc None nếu chưa có/không đọc được"""
+    model_path, _ = _artifact_paths()
+    if not os.path.exists(model_path):
+        return None
+    try:
+        with open(model_path, 'rb') as f:
+            return pickle.load(f)
+    except Exception as e:
+        print(f"Warning: Could not read CLO model artifact {model_path}: {e}")
+        return None
+
+
+def load_model_artifact(model_trainer, key):
+    """Nạp model đã train vào ModelTrainer nếu artifact khớp key và feature_names. Trả về True nếu thành công"""
+    model_path, _ = _artifact_paths()
+    artifact = read_model_artifact()
+    if artifact is None:
+        return False
+    if artifact.get('key') != key or artifact.get('version') != MODEL_ARTIFACT_VERSION:
+        print("CLO model artifact is stale (data or training config changed), retraining...")
+        return False
+    
+    data_loader = model_trainer.data_loader
+    if artifact['feature_names'] != list(data_loader.feature_names):
+        print("CLO model artifact has different features, retraining...")
+        return False
+    # Artifacts updated incrementally keep their original codes: re-encode the feature columns
+    data_loader.extend_encoders(artifact['encoders'])
+    if model_trainer.X is not None:
+        # X was selected before the remap: take it again so it carries the artifact's codes
+        model_trainer.reselect_features()
+    model_trainer.model = artifact['model']
+    model_trainer.trained_through = artifact.get('trained_through')
+    print(f"Loaded CLO model artifact: {model_path} ({len(artifact['feature_names'])} features)")
+    return True
+
+
+def load_incremental_base(model_trainer, optimize_params):
+    """Artifact có thể cập nhật tăng dần: cùng code train/feature, cùng features, có mốc học kỳ và các dòng
+    đến mốc đó không đổi (history_fingerprint). None nếu không"""
+    artifact = read_model_artifact()
+    if artifact is None or artifact.get('version') != MODEL_ARTIFACT_VERSION or artifact.get('trained_through') is None:
+        return None
+    if (artifact.get('code_version') != model_code_version()
+            or artifact.get('feature_code_version') != feature_code_version()
+            or artifact.get('optimize_params') != bool(optimize_params)
+            or artifact['feature_names'] != list(model_trainer.data_loader.feature_names)):
+        print("CLO model artifact was trained with different code or features, full retrain needed")
+        return None
+    if artifact.get('history_fingerprint') != model_trainer.history_fingerprint(artifact['trained_through']):
+        print(f"Rows up to {artifact['trained_through']} were edited or removed, full retrain needed")
+        return None
+    return artifact
@@ -1,20 +1,123 @@
+import os
+import copy
+import time
+import hashlib
 import pandas as pd
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from joblib import Parallel, delayed
+from sklearn.base import clone
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier, VotingClassifier
-from sklearn.model_selection import train_test_split, cross_val_score, RandomizedSearchCV
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import train_test_split, StratifiedKFold, RandomizedSearchCV, HalvingRandomSearchCV
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
-from .config import RF_PARAMS, GB_PARAMS
+from .config import (CLO_BACKENDS, BACKEND_PARAMS, CACHE_DIR, SEARCH_MODE, SEARCH_N_JOBS, SEARCH_CACHE_ENABLED, TRAIN_CV_FOLDS,
+                     TRAIN_N_JOBS, TERM_COLUMNS, INCREMENTAL_GROWTH, INCREMENTAL_COMPARE_FULL, MAIN_DATA_SCHEMA,
+                     COMPACT_PRUNE_DEPTH, COMPACT_MAX_TREES)
 from .utils import safe_float
+from .estimators import make_estimator, backend_label, grow_estimator
+from .profiling import StageProfiler
+from .tree_export import export_compact_ensemble
 from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import LabelEncoder
+from sklearn.utils import Bunch
 import json
 
+# Relative cost of each estimator family, used to split the search core budget
+SEARCH_WEIGHTS = {'LogisticRegression': 1, 'RandomForest': 2, 'GradientBoosting': 2}
+# Estimator backend -> searched family whose best params it accepts (same parameter names)
+SEARCH_FAMILIES = {'random_forest': 'RandomForest', 'extra_trees': 'RandomForest', 'gradient_boosting': 'GradientBoosting'}
+
+
+def split_core_budget(budget, weights=SEARCH_WEIGHTS):
+    """Chia ngân sách core cho từng họ mô hình theo trọng số (mỗi họ ít nhất 1 core)"""
+    total = sum(weights.values())
+    shares = {name: max(1, budget * weight // total) for name, weight in weights.items()}
+    leftover = budget - sum(shares.values())
+    for name in sorted(weights, key=weights.get, reverse=True):
+        if leftover <= 0:
+            break
+        shares[name] += 1
+        leftover -= 1
+    return shares
+
+
+def apply_searched_params(backend_params, searched, backends=CLO_BACKENDS):
+    """Tham số cho từng backend được chọn: kết quả tìm của họ tương ứng (SEARCH_FAMILIES) thay cho BACKEND_PARAMS.
+
+    ``searched`` là {họ: best_params}. In cảnh báo cho backend không có họ được tìm (dùng tham số mặc định)
+    và cho họ được tìm mà không backend nào dùng (kết quả bị bỏ).
+    """
+    params = dict(backend_params)
+    used = set()
+    for name, backend in backends.items():
+        family = SEARCH_FAMILIES.get(backend)
+        if family in searched:
+            params[backend] = searched[family]
+            used.add(family)
+        else:
+            print(f"Warning: No hyperparameter search for ensemble member '{name}' ({backend}), "
+                  f"training with BACKEND_PARAMS")
+    for family in sorted(set(searched) - used):
+        print(f"Warning: Searched {family} params are not used by any CLO_BACKENDS member")
+    return params
+
+
+def search_cache_key(X, y, grids, **settings):
+    """Key cache kết quả tìm tham số: fingerprint dữ liệu (X, y), lưới tham số và cấu hình tìm kiếm"""
+    sha = hashlib.sha256()
+    sha.update(pd.util.hash_pandas_object(X, index=False).values.tobytes())
+    sha.update(pd.util.hash_pandas_object(y, index=False).values.tobytes())
+    sha.update(json.dumps({'columns': list(X.columns), 'grids': grids, 'settings': settings},
+                          sort_keys=True, default=str).encode('utf-8'))
+    return sha.hexdigest()[:16]
+
+def prefit_voting_classifier(named_estimators, y, voting='soft'):
+    """VotingClassifier dựng từ các mô hình đã fit (không clone và fit lại từng thành viên)"""
+    ensemble = VotingClassifier(estimators=named_estimators, voting=voting)
+    ensemble.estimators_ = [estimator for _, estimator in named_estimators]
+    ensemble.named_estimators_ = Bunch(**dict(named_estimators))
+    ensemble.le_ = LabelEncoder().fit(y)
+    ensemble.classes_ = ensemble.le_.classes_
+    return ensemble
+
+
+def _fold_probas(members, X, y, train_idx, val_idx):
+    """Fit bản sao của các mô hình thành viên trên một fold, trả về xác suất dự đoán phần validation"""
+    X_train, y_train, X_val = X.iloc[train_idx], y.iloc[train_idx], X.iloc[val_idx]
+    return {name: clone(model).fit(X_train, y_train).predict_proba(X_val) for name, model in members}
+
+
 class ModelTrainer:
-    def __init__(self, data_loader):
+    def __init__(self, data_loader, profiler=None):
         self.data_loader = data_loader
+        self.profiler = profiler or StageProfiler(enabled=False)
         self.df = data_loader.df
         self.model = None
+        self.compact_model = None  # Flattened copy of self.model used for prediction (export_compact_model)
         self.X = None
         self.y = None
+        self.test_predictions = None
+        self.trained_through = None  # Latest term (see term_keys) seen by the trained model
+
+    def term_keys(self):
+        """Khóa học kỳ có thể so sánh được của từng dòng, ví dụ '2023-2024/2' (theo TERM_COLUMNS)"""
+        keys = self.df[TERM_COLUMNS[0]].astype(str)
+        for col in TERM_COLUMNS[1:]:
+            keys = keys + '/' + self.df[col].astype(str)
+        return keys
+
+    def history_fingerprint(self, trained_through):
+        """Fingerprint các dòng bảng điểm đã được train (học kỳ <= trained_through).
+
+        Chỉ dùng các cột gốc của bảng điểm (MAIN_DATA_SCHEMA), không dùng các cột *_encoded
+        vì mã của chúng phụ thuộc vào thứ tự fit LabelEncoder.
+        """
+        columns = [col for cols in MAIN_DATA_SCHEMA.values() for col in cols if col in self.df.columns]
+        history = self.df.loc[(self.term_keys() <= trained_through).to_numpy(), columns]
+        sha = hashlib.sha256(json.dumps(columns).encode('utf-8'))
+        sha.update(pd.util.hash_pandas_object(history, index=False).values.tobytes())
+        return sha.hexdigest()[:16]
 
     def prepare_data(self):
         """Prepare X and y for training"""
@@ -34,9 +137,25 @@ class ModelTrainer:
         # Update feature names to only include available ones
         self.data_loader.feature_names = available_features
 
-    def optimize_hyperparameters(self, X, y, n_iter=20, cv=3, random_state=42):
-        """Tối ưu tham số cho Logistic Regression, Random Forest và Gradient Boosting bằng RandomizedSearchCV. Ghi kết quả vào model_stats.txt"""
-        print("\n=== TỐI ƯU THAM SỐ (RandomizedSearchCV) ===")
+    def reselect_features(self):
+        """Lấy lại X, y từ self.df, ví dụ sau khi extend_encoders ánh xạ lại các cột *_encoded"""
+        self.X = self.df[self.X.columns]
+        self.y = self.df['passed']
+
+    def convert_features(self):
+        """Convert all feature columns of X to numeric (VT/invalid -> 0)"""
+        for col in self.X.columns:
+            self.X[col] = self.X[col].apply(safe_float)
+
+    def optimize_hyperparameters(self, X, y, n_iter=20, cv=3, random_state=42, search_mode=SEARCH_MODE, n_jobs=SEARCH_N_JOBS):
+        """Tối ưu tham số cho Logistic Regression, Random Forest và Gradient Boosting. Ghi kết quả vào model_stats.txt
+
+        Ba họ mô hình được tìm đồng thời, chia chung ngân sách core (n_jobs). Mode 'halving' dùng
+        HalvingRandomSearchCV: cấu hình yếu bị loại sớm trên tập con nhỏ. Kết quả được cache theo
+        fingerprint dữ liệu và lưới tham số nên chạy lại trên cùng dữ liệu trả về ngay.
+        """
+        search_name = 'HalvingRandomSearchCV' if search_mode == 'halving' else 'RandomizedSearchCV'
+        print(f"\n=== TỐI ƯU THAM SỐ ({search_name}) ===")
         lr_param_grid = {
             'C': [0.01, 0.1, 1, 10, 100],
             'penalty': ['l2'],
@@ -55,50 +174,70 @@ class ModelTrainer:
             'max_depth': [3, 5, 7, 10],
             'subsample': [0.8, 1.0],
         }
-        lr = LogisticRegression(random_state=random_state)
-        rf = RandomForestClassifier(random_state=random_state)
-        gb = GradientBoostingClassifier(random_state=random_state)
-        lr_search = RandomizedSearchCV(lr, lr_param_grid, n_iter=n_iter, cv=cv, scoring='accuracy', random_state=random_state, n_jobs=-1, verbose=1)
-        rf_search = RandomizedSearchCV(rf, rf_param_grid, n_iter=n_iter, cv=cv, scoring='accuracy', random_state=random_state, n_jobs=-1, verbose=1)
-        gb_search = RandomizedSearchCV(gb, gb_param_grid, n_iter=n_iter, cv=cv, scoring='accuracy', random_state=random_state, n_jobs=-1, verbose=1)
-        print("Tối ưu Logistic Regression...")
-        lr_search.fit(X, y)
-        print(f"Best LR params: {lr_search.best_params_}, best score: {lr_search.best_score_:.4f}")
-        print("Tối ưu Random Forest...")
-        rf_search.fit(X, y)
-        print(f"Best RF params: {rf_search.best_params_}, best score: {rf_search.best_score_:.4f}")
-        print("Tối ưu Gradient Boosting...")
-        gb_search.fit(X, y)
-        print(f"Best GB params: {gb_search.best_params_}, best score: {gb_search.best_score_:.4f}")
-        # Ghi kết quả vào file model_stats.txt
-        stats = {
-            'LogisticRegression': {'best_params': lr_search.best_params_, 'best_score': lr_search.best_score_},
-            'RandomForest': {'best_params': rf_search.best_params_, 'best_score': rf_search.best_score_},
-            'GradientBoosting': {'best_params': gb_search.best_params_, 'best_score': gb_search.best_score_}
+        searches = {
+            'LogisticRegression': (LogisticRegression(random_state=random_state), lr_param_grid),
+            'RandomForest': (RandomForestClassifier(random_state=random_state), rf_param_grid),
+            'GradientBoosting': (GradientBoostingClassifier(random_state=random_state), gb_param_grid)
         }
+        
+        stats = None
+        cache_path = None
+        if SEARCH_CACHE_ENABLED:
+            key = search_cache_key(X, y, {name: grid for name, (_, grid) in searches.items()},
+                                   n_iter=n_iter, cv=cv, random_state=random_state, search_mode=search_mode)
+            cache_path = os.path.join(CACHE_DIR, 'search', f'best_params_{key}.json')
+            try:
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    stats = json.load(f)
+                print(f"Dùng kết quả tìm tham số đã cache: {cache_path}")
+            except (OSError, ValueError):
+                stats = None
+        
+        if stats is None:
+            shares = split_core_budget(n_jobs or os.cpu_count() or 1)
+            
+            def run_search(name):
+                estimator, grid = searches[name]
+                if search_mode == 'halving':
+                    search = HalvingRandomSearchCV(estimator, grid, n_candidates=n_iter, cv=cv, scoring='accuracy',
+                                                   random_state=random_state, n_jobs=shares[name])
+                else:
+                    search = RandomizedSearchCV(estimator, grid, n_iter=n_iter, cv=cv, scoring='accuracy',
+                                                random_state=random_state, n_jobs=shares[name])
+                start = time.perf_counter()
+                search.fit(X, y)
+                return name, search, time.perf_counter() - start
+            
+            print(f"Tối ưu đồng thời LR, RF, GB (cores: {shares})...")
+            with ThreadPoolExecutor(max_workers=len(searches)) as executor:
+                results = list(executor.map(run_search, searches))
+            stats = {}
+            for name, search, elapsed in results:
+                print(f"Best {name} params: {search.best_params_}, best score: {search.best_score_:.4f} ({elapsed:.1f}s)")
+                stats[name] = {'best_params': search.best_params_, 'best_score': search.best_score_}
+            if cache_path:
+                os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+                with open(cache_path, 'w', encoding='utf-8') as f:
+                    json.dump(stats, f, indent=2, ensure_ascii=False)
+        else:
+            for name, result in stats.items():
+                print(f"Best {name} params: {result['best_params']}, best score: {result['best_score']:.4f}")
+        
+        # Ghi kết quả vào file model_stats.txt
         with open('model_stats.txt', 'w', encoding='utf-8') as f:
             f.write(json.dumps(stats, indent=2, ensure_ascii=False))
-        return lr_search.best_params_, rf_search.best_params_, gb_search.best_params_
+        return (stats['LogisticRegression']['best_params'], stats['RandomForest']['best_params'],
+                stats['GradientBoosting']['best_params'])
 
     def train_models(self, optimize_params=False):
         """Train the ensemble model"""
         print("Training models...")
         
-        def safe_float(x):
-            try:
-                if pd.isna(x):
-                    return 0.0
-                if isinstance(x, str):
-                    if x.upper() == 'VT':
-                        return 0.0
-                    x = x.replace(',', '.')
-                return float(x)
-            except (ValueError, TypeError):
-                return 0.0
-        
         # Convert all features to numeric
-        for col in self.X.columns:
-            self.X[col] = self.X[col].apply(safe_float)
+        stage = self.profiler.stage
+        with stage('convert_features', rows=len(self.X)):
+            self.convert_features()
+        self.trained_through = self.term_keys().max()
         
         # Split data
         X_train, X_test, y_train, y_test = train_test_split(
@@ -107,45 +246,50 @@ class ModelTrainer:
         
         # Tối ưu tham số nếu được yêu cầu
         lr_params = {'max_iter': 1000, 'random_state': 42}
-        rf_params, gb_params = RF_PARAMS, GB_PARAMS
+        backend_params = dict(BACKEND_PARAMS)
         if optimize_params:
-            lr_params, rf_params, gb_params = self.optimize_hyperparameters(X_train, y_train)
-        # Initialize models
+            with stage('search', rows=len(X_train)):
+                lr_params, rf_params, gb_params = self.optimize_hyperparameters(X_train, y_train)
+            backend_params = apply_searched_params(backend_params,
+                                                   {'RandomForest': rf_params, 'GradientBoosting': gb_params})
+        # Initialize models (ensemble members come from the CLO_BACKENDS registry selection)
         lr_model = LogisticRegression(**lr_params)
-        rf_model = RandomForestClassifier(**rf_params)
-        gb_model = GradientBoostingClassifier(**gb_params)
+        members = [(name, make_estimator(backend, backend_params[backend])) for name, backend in CLO_BACKENDS.items()]
         # Train individual models
         print("Training Logistic Regression (baseline)...")
-        lr_model.fit(X_train, y_train)
+        with stage('fit_lr', rows=len(X_train)):
+            lr_model.fit(X_train, y_train)
         lr_score = lr_model.score(X_test, y_test)
         print(f"Logistic Regression accuracy: {lr_score:.4f}")
-        print("Training Random Forest...")
-        rf_model.fit(X_train, y_train)
-        rf_score = rf_model.score(X_test, y_test)
-        print(f"Random Forest accuracy: {rf_score:.4f}")
-        print("Training Gradient Boosting...")
-        gb_model.fit(X_train, y_train)
-        gb_score = gb_model.score(X_test, y_test)
-        print(f"Gradient Boosting accuracy: {gb_score:.4f}")
-        # Create optimized ensemble model (RF + GB only for best performance)
-        self.model = VotingClassifier(
-            estimators=[
-                ('rf', rf_model),
-                ('gb', gb_model)
-            ],
-            voting='soft'
-        )
-        # Train ensemble
-        print("Training ensemble model...")
-        self.model.fit(X_train, y_train)
-        ensemble_score = self.model.score(X_test, y_test)
+        member_probas, member_scores = [], {}
+        for name, model in members:
+            label = backend_label(CLO_BACKENDS[name])
+            print(f"Training {label}...")
+            with stage(f'fit_{name}', rows=len(X_train)):
+                model.fit(X_train, y_train)
+            proba = model.predict_proba(X_test)
+            member_probas.append(proba)
+            member_scores[name] = accuracy_score(y_test, model.classes_[proba.argmax(axis=1)])
+            print(f"{label} accuracy: {member_scores[name]:.4f}")
+        # Create optimized ensemble model (RF + GB only for best performance) from the fitted members
+        self.model = prefit_voting_classifier(members, y_train)
+        ensemble_proba = np.average(member_probas, axis=0)
+        y_pred = self.model.classes_[ensemble_proba.argmax(axis=1)]
+        ensemble_score = accuracy_score(y_test, y_pred)
         print(f"Ensemble accuracy: {ensemble_score:.4f}")
+        # Test-set predictions are reused by evaluate_model
+        self.test_predictions = {'y_test': y_test, 'y_pred': y_pred, 'y_pred_proba': ensemble_proba[:, 1]}
         # Cross-validation
-        cv_scores = cross_val_score(self.model, X_train, y_train, cv=5)
+        with stage('cross_validation', rows=len(X_train)):
+            cv_results = self.cross_validate_members(members, X_train, y_train)
+        cv_scores = cv_results['ensemble']
         print(f"Cross-validation accuracy: {cv_scores.mean():.4f} (+/- {cv_scores.std() * 2:.4f})")
-        # Feature importance
-        if hasattr(rf_model, 'feature_importances_'):
-            feature_importance = rf_model.feature_importances_
+        for name, _ in members:
+            print(f"  {name} cross-validation accuracy: {cv_results[name].mean():.4f} (+/- {cv_results[name].std() * 2:.4f})")
+        # Feature importance (first member exposing feature_importances_)
+        importance_model = next((model for _, model in members if hasattr(model, 'feature_importances_')), None)
+        if importance_model is not None:
+            feature_importance = importance_model.feature_importances_
             feature_names = self.data_loader.feature_names
             importance_df = pd.DataFrame({
                 'feature': feature_names,
@@ -155,27 +299,147 @@ class ModelTrainer:
             print(importance_df.head(10))
         return {
             'lr_score': lr_score,
-            'rf_score': rf_score,
-            'gb_score': gb_score,
+            **{f'{name}_score': score for name, score in member_scores.items()},
             'ensemble_score': ensemble_score,
             'cv_mean': cv_scores.mean(),
-            'cv_std': cv_scores.std()
+            'cv_std': cv_scores.std(),
+            'cv_member_means': {name: cv_results[name].mean() for name, _ in members}
         }
 
+    def update_models(self, previous_model, previous_encoders, trained_through,
+                      growth=INCREMENTAL_GROWTH, compare_full=INCREMENTAL_COMPARE_FULL, random_state=42):
+        """Cập nhật tăng dần ensemble đã lưu bằng các học kỳ mới (sau ``trained_through``).
+
+        Các LabelEncoder cũ được mở rộng thay vì fit lại; mỗi thành viên được thêm cây (RF) hoặc
+        stage (GB) bằng warm_start chỉ trên dữ liệu mới, nên thời gian tỉ lệ với lượng dữ liệu mới.
+        Accuracy được đo trên 20% dữ liệu mới giữ lại (với một bản sao chỉ grow trên 80% còn lại);
+        model được lưu grow trên toàn bộ dữ liệu mới. compare_full (benchmark, tốn bằng một lần
+        train lại) so sánh thêm với train lại toàn bộ. Trả về None nếu không cập nhật tăng dần được.
+        """
+        terms = self.term_keys()
+        new_rows = (terms > trained_through).to_numpy()
+        y_new = self.y[new_rows]
+        if not new_rows.any():
+            print(f"No data after {trained_through}, incremental update not possible")
+            return None
+        if y_new.nunique() < 2 or y_new.value_counts().min() < 2:
+            print(f"Not enough new data of every class after {trained_through}, incremental update not possible")
+            return None
+        print(f"Incremental update: {int(new_rows.sum())} new rows after {trained_through} "
+              f"({len(new_rows)} rows in total)")
+        
+        # Keep the previous codes: extend the saved encoders and re-encode the feature columns
+        self.data_loader.extend_encoders(previous_encoders)
+        self.reselect_features()
+        self.convert_features()
+        
+        X_new_train, X_new_test, y_new_train, y_new_test = train_test_split(
+            self.X[new_rows], y_new, test_size=0.2, random_state=random_state, stratify=y_new
+        )
+        previous_score = accuracy_score(y_new_test, previous_model.predict(X_new_test))
+        print(f"Previous model accuracy on new data: {previous_score:.4f}")
+        
+        members = list(previous_model.named_estimators_.items())
+        fresh_members = [(name, clone(model)) for name, model in members]
+        # Score a copy grown on the training split only, so the held-out rows stay unseen
+        scored_members = [(name, copy.deepcopy(model)) for name, model in members]
+        for _, model in scored_members:
+            grow_estimator(model, X_new_train, y_new_train, growth)
+        scored_model = prefit_voting_classifier(scored_members, self.y)
+        ensemble_proba = scored_model.predict_proba(X_new_test)
+        y_pred = scored_model.classes_[ensemble_proba.argmax(axis=1)]
+        incremental_score = accuracy_score(y_new_test, y_pred)
+        print(f"Incremental ensemble accuracy on new data: {incremental_score:.4f}")
+        
+        # The saved model is grown on every new row: the watermark moves past all of them
+        start = time.perf_counter()
+        for name, model in members:
+            added = grow_estimator(model, self.X[new_rows], y_new, growth)
+            print(f"Grew {type(model).__name__} by {added} on {int(new_rows.sum())} new rows")
+        self.model = prefit_voting_classifier(members, self.y)
+        incremental_seconds = time.perf_counter() - start
+        print(f"Incremental update: {incremental_seconds:.1f}s")
+        
+        results = {
+            'mode': 'incremental',
+            'trained_through': trained_through,
+            'new_rows': int(new_rows.sum()),
+            'previous_score': previous_score,
+            'incremental_score': incremental_score,
+            'incremental_seconds': incremental_seconds
+        }
+        if compare_full:
+            # Full retrain on history + the same new training rows, scored on the same held-out rows
+            start = time.perf_counter()
+            X_full = pd.concat([self.X[~new_rows], X_new_train])
+            y_full = pd.concat([self.y[~new_rows], y_new_train])
+            probas = [model.fit(X_full, y_full).predict_proba(X_new_test) for _, model in fresh_members]
+            full_score = accuracy_score(y_new_test, self.model.classes_[np.average(probas, axis=0).argmax(axis=1)])
+            full_seconds = time.perf_counter() - start
+            print(f"Full retrain accuracy on new data: {full_score:.4f} ({full_seconds:.1f}s)")
+            print(f"Accuracy delta (incremental - full): {incremental_score - full_score:+.4f}, "
+                  f"speedup: {full_seconds / max(incremental_seconds, 1e-9):.1f}x")
+            results.update({'full_score': full_score, 'full_seconds': full_seconds,
+                            'accuracy_delta': incremental_score - full_score})
+        
+        self.trained_through = terms.max()
+        self.test_predictions = {'y_test': y_new_test, 'y_pred': y_pred, 'y_pred_proba': ensemble_proba[:, 1]}
+        return results
+
+    def export_compact_model(self, max_depth=COMPACT_PRUNE_DEPTH, max_trees=COMPACT_MAX_TREES):
+        """Xuất ensemble đã train thành CompactTreeEnsemble (mảng node float32) để dự đoán nhanh"""
+        self.compact_model = None
+        if self.model is None:
+            return None
+        try:
+            self.compact_model = export_compact_ensemble(self.model, list(self.X.columns), max_depth, max_trees)
+        except ValueError as e:
+            print(f"Warning: Could not export compact model, predicting with the sklearn ensemble: {e}")
+            return None
+        print(f"Exported compact model: {self.compact_model.n_nodes} nodes, {self.compact_model.nbytes / 2 ** 20:.1f} MiB")
+        return self.compact_model
+
+    def cross_validate_members(self, members, X, y, cv=TRAIN_CV_FOLDS, n_jobs=TRAIN_N_JOBS):
+        """Cross-validation song song theo fold cho ensemble soft-voting.
+
+        Mỗi fold fit các thành viên đúng một lần; xác suất dự đoán được dùng lại để tính
+        accuracy cho từng thành viên và cho ensemble (trung bình xác suất, như VotingClassifier).
+        """
+        folds = list(StratifiedKFold(n_splits=cv).split(X, y))
+        fold_probas = Parallel(n_jobs=n_jobs)(
+            delayed(_fold_probas)(members, X, y, train_idx, val_idx) for train_idx, val_idx in folds
+        )
+        classes = np.unique(y)
+        scores = {name: [] for name, _ in members}
+        scores['ensemble'] = []
+        for (_, val_idx), probas in zip(folds, fold_probas):
+            y_val = y.iloc[val_idx].values
+            for name, proba in probas.items():
+                scores[name].append(accuracy_score(y_val, classes[proba.argmax(axis=1)]))
+            ensemble_proba = np.average(list(probas.values()), axis=0)
+            scores['ensemble'].append(accuracy_score(y_val, classes[ensemble_proba.argmax(axis=1)]))
+        return {name: np.array(values) for name, values in scores.items()}
+
     def evaluate_model(self):
         """Evaluate the trained model"""
         if self.model is None:
             print("No model trained yet. Run train_models() first.")
             return
         
-        # Split data for evaluation
-        X_train, X_test, y_train, y_test = train_test_split(
-            self.X, self.y, test_size=0.2, random_state=42, stratify=self.y
-        )
-        
-        # Make predictions
-        y_pred = self.model.predict(X_test)
-        y_pred_proba = self.model.predict_proba(X_test)[:, 1]
+        if self.test_predictions is not None:
+            # Reuse the test-set predictions computed in train_models
+            y_test = self.test_predictions['y_test']
+            y_pred = self.test_predictions['y_pred']
+            y_pred_proba = self.test_predictions['y_pred_proba']
+        else:
+            # Split data for evaluation
+            X_train, X_test, y_train, y_test = train_test_split(
+                self.X, self.y, test_size=0.2, random_state=42, stratify=self.y
+            )
+            
+            # Make predictions
+            y_pred = self.model.predict(X_test)
+            y_pred_proba = self.model.predict_proba(X_test)[:, 1]
         
         # Calculate metrics
         accuracy = accuracy_score(y_test, y_pred)
@@ -3,6 +3,11 @@ import numpy as np
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, accuracy_score
+try:
+    from .method_table import load_method_table
+except ImportError:
+    # Chạy trực tiếp dưới dạng script
+    from method_table import load_method_table
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -22,7 +27,7 @@ class PPDGIntegration:
             'EM 8': 'Đánh giá báo cáo/tiểu luận (Written Report/Essay Assessment)',
             'EM 9': 'Đánh giá thực hành (Practical Assessment)',
             'EM 10': 'Đánh giá đồ án (Project Assessment)',
-            'EM11': 'Đánh giá thực hành tại phòng thí nghiệm (Practice In The Laboratory Assessment)',
+            'EM 11': 'Đánh giá thực hành tại phòng thí nghiệm (Practice In The Laboratory Assessment)',
             'EM 12': 'Đánh giá bài tập lớn/Đồ án cá nhân (Major Assignment/Individual Project Assessment)',
             'EM 14': 'Đánh giá khác (Other Assessment)'
         }
@@ -63,7 +68,7 @@ class PPDGIntegration:
             'EM 6': ['TM1', 'TM2', 'TM4'],  # Kiểm tra viết phù hợp với giảng dạy trực tiếp
             'EM 7': ['TM1', 'TM2', 'TM4'],  # Trắc nghiệm phù hợp với giảng dạy trực tiếp
             'EM 8': ['TM16', 'TM18', 'TM19'],  # Báo cáo/tiểu luận phù hợp với case study, project
-            'EM11': ['TM6', 'TM7', 'TM8'],  # Thực hành phòng thí nghiệm
+            'EM 11': ['TM6', 'TM7', 'TM8'],  # Thực hành phòng thí nghiệm
             'EM 12': ['TM18', 'TM19']  # Đồ án phù hợp với project, research
         }
         
@@ -72,9 +77,9 @@ class PPDGIntegration:
         self.feature_importance = None
         
     def load_ppdg_data(self):
-        """Load dữ liệu PPDG"""
+        """Load dữ liệu PPDG (bảng 0/1 từ MethodTable dùng chung, không đọc lại Excel)"""
         try:
-            df_ppdg = pd.read_excel('dulieu/PPDG.xlsx')
+            df_ppdg = load_method_table().frame('EM')
             print(f"Đã load dữ liệu PPDG: {len(df_ppdg)} môn học")
             return df_ppdg
         except Exception as e:
@@ -93,9 +98,9 @@ class PPDGIntegration:
             # Tìm các cột EM
             em_columns = [col for col in df_ppdg.columns if col.startswith('EM')]
             
-            # Tạo features PPDG (1 = có sử dụng, 0 = không sử dụng)
+            # Tạo features PPDG (1 = có sử dụng, 0 = không sử dụng / môn học không có trong PPDG)
             for col in em_columns:
-                merged_df[f'{col}_used'] = merged_df[col].notna().astype(int)
+                merged_df[f'{col}_used'] = merged_df[col].fillna(0).astype(int)
             
             # Tạo features tổng hợp
             ppdg_features = [f'{col}_used' for col in em_columns]
@@ -103,7 +108,7 @@ class PPDGIntegration:
             
             # Tạo features theo loại đánh giá
             formative_ppdg = ['EM 1_used', 'EM 2_used', 'EM 3_used', 'EM 4_used', 'EM 5_used']
-            summative_ppdg = ['EM 6_used', 'EM 7_used', 'EM 8_used', 'EM 9_used', 'EM 10_used', 'EM11_used', 'EM 12_used', 'EM 14_used']
+            summative_ppdg = ['EM 6_used', 'EM 7_used', 'EM 8_used', 'EM 9_used', 'EM 10_used', 'EM 11_used', 'EM 12_used', 'EM 14_used']
             
             merged_df['formative_ppdg_count'] = merged_df[formative_ppdg].sum(axis=1)
             merged_df['summative_ppdg_count'] = merged_df[summative_ppdg].sum(axis=1)
@@ -203,27 +208,21 @@ class PPDGIntegration:
             return None
     
     def get_subject_ppdg_info(self, subject_id):
-        """Lấy thông tin PPDG của một môn học"""
+        """Lấy thông tin PPDG của một môn học ({mã EM chuẩn: có sử dụng}, từ bảng bitmask dùng chung)"""
         try:
-            df_ppdg = pd.read_excel('dulieu/PPDG.xlsx')
-            subject_data = df_ppdg[df_ppdg['Subject_ID'] == subject_id]
-            
-            if len(subject_data) > 0:
-                em_columns = [col for col in df_ppdg.columns if col.startswith('EM')]
-                ppdg_info = {}
-                
-                for col in em_columns:
-                    value = subject_data[col].iloc[0]
-                    # Kiểm tra giá trị 'X', 'x' hoặc không null
-                    ppdg_info[col] = (value == 'X' or value == 'x' or (pd.notna(value) and str(value).strip() != '' and str(value).strip() != 'nan'))
-                
-                return ppdg_info
-            else:
-                return None
+            return load_method_table().methods(subject_id, 'EM')
         except Exception as e:
             print(f"Lỗi khi lấy thông tin PPDG: {e}")
             return None
     
+    def get_subject_teaching_methods(self, subject_id):
+        """Các phương pháp giảng dạy (mã TM) của môn học theo PPGD ([] nếu không có dữ liệu)"""
+        try:
+            return load_method_table().used(subject_id, 'TM')
+        except Exception as e:
+            print(f"Lỗi khi lấy thông tin PPGD: {e}")
+            return []
+    
     def analyze_ppdg_impact(self, ppdg_info, student_data):
         """Phân tích ảnh hưởng của PPDG đến CLO"""
         print("\n=== PHÂN TÍCH ẢNH HƯỞNG PPDG ===")
@@ -303,7 +302,7 @@ class PPDGIntegration:
             'EM 6': "Ôn tập kỹ cho bài kiểm tra viết",
             'EM 7': "Luyện tập kỹ năng làm bài trắc nghiệm",
             'EM 8': "Viết báo cáo/tiểu luận chất lượng cao",
-            'EM11': "Thực hành kỹ lưỡng tại phòng thí nghiệm",
+            'EM 11': "Thực hành kỹ lưỡng tại phòng thí nghiệm",
             'EM 12': "Hoàn thành bài tập lớn/đồ án đúng hạn"
         }
         
@@ -329,7 +328,9 @@ class PPDGIntegration:
         # Đánh giá hiệu quả dựa trên điểm dự đoán
         effectiveness_analysis = self.evaluate_ppdg_effectiveness(ppdg_info, predicted_score)
         
-        # Phân tích tương thích với phương pháp giảng dạy
+        # Phân tích tương thích với phương pháp giảng dạy (mặc định: PPGD của môn học)
+        if not teaching_methods:
+            teaching_methods = self.get_subject_teaching_methods(subject_id) or None
         compatibility_analysis = self.analyze_teaching_method_compatibility(ppdg_info, teaching_methods)
         
         # Đề xuất cải thiện phương pháp giảng dạy
@@ -560,7 +561,7 @@ class PPDGIntegration:
         
         # Điểm cho các PPDG đặc biệt
         special_score = 0
-        special_ppdg = ['EM 3', 'EM 4', 'EM 8', 'EM11', 'EM 12']  # Các PPDG phát triển kỹ năng
+        special_ppdg = ['EM 3', 'EM 4', 'EM 8', 'EM 11', 'EM 12']  # Các PPDG phát triển kỹ năng
         for code in used_ppdg:
             if code in special_ppdg:
                 special_score += 0.5
@@ -632,7 +633,7 @@ class PPDGIntegration:
             weaknesses.append("Thiếu đánh giá tổng kết, khó đánh giá toàn diện")
         
         # Phân tích các PPDG đặc biệt
-        special_ppdg = ['EM 3', 'EM 4', 'EM 8', 'EM11', 'EM 12']
+        special_ppdg = ['EM 3', 'EM 4', 'EM 8', 'EM 11', 'EM 12']
         special_count = sum(1 for code in used_ppdg if code in special_ppdg)
         
         if special_count >= 2:
@@ -667,7 +668,7 @@ class PPDGIntegration:
             priority_levels.append("CAO")
         
         if current_status['summative_count'] < 2:
-            recommendations.append("Bổ sung thêm đánh giá tổng kết (EM 6, EM 7, EM 8, EM11, EM 12)")
+            recommendations.append("Bổ sung thêm đánh giá tổng kết (EM 6, EM 7, EM 8, EM 11, EM 12)")
             priority_levels.append("TRUNG BÌNH")
         
         # Khuyến nghị dựa trên điểm dự đoán
@@ -692,7 +693,7 @@ class PPDGIntegration:
         # Khuyến nghị cụ thể cho từng PPDG thiếu
         missing_ppdg = []
         for code, used in ppdg_info.items():
-            if not used and code in ['EM 1', 'EM 2', 'EM 3', 'EM 4', 'EM 5', 'EM 8', 'EM11']:
+            if not used and code in ['EM 1', 'EM 2', 'EM 3', 'EM 4', 'EM 5', 'EM 8', 'EM 11']:
                 ppdg_name = self.ppdg_mapping.get(code, code)
                 missing_ppdg.append(f"{code} ({ppdg_name})")
         
@@ -1,27 +1,86 @@
 import pandas as pd
 import numpy as np
+from .config import PREDICT_BATCH_SIZE
+from .stats_tables import StatsTables
 from .utils import safe_float
 
+# Input columns of Predictor.predict_many
+BATCH_COLUMNS = ['student_id', 'lecturer', 'subject_id']
+
 class Predictor:
     def __init__(self, data_loader, model_trainer):
         self.data_loader = data_loader
         self.df = data_loader.df
-        self.model = model_trainer.model
+        # Flattened copy of the ensemble when available (same probabilities, much faster per call)
+        self.model = model_trainer.compact_model if model_trainer.compact_model is not None else model_trainer.model
+        # predict_many: the sklearn ensemble (compiled per-tree traversal) is faster on large batches
+        self.batch_model = model_trainer.model if model_trainer.model is not None else self.model
         self.X = model_trainer.X
         self.y = model_trainer.y
+        self._feature_matrix = None  # self.df features as float64, built on the first predict_many
+        self.build_indexes()
+        # Per subject / lecturer / (lecturer, subject) statistics, refreshed by refresh_data
+        self.stats = StatsTables(self.normalize_lecturer)
+        self.stats.build(self.df)
+
+    @staticmethod
+    def normalize_lecturer(name):
+        """Khóa chỉ mục của tên giảng viên (không phân biệt hoa thường)"""
+        return str(name).lower()
+
+    @staticmethod
+    def _group_positions(values, normalize=str):
+        """{normalize(giá trị): mảng vị trí dòng tăng dần} cho một cột (bỏ qua NaN)"""
+        codes, uniques = pd.factorize(values)
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        index = {}
+        for i, value in enumerate(uniques):
+            key, positions = normalize(value), order[bounds[i]:bounds[i + 1]]
+            # Distinct values with the same key (e.g. differing only in case) share one group
+            index[key] = np.sort(np.concatenate([index[key], positions])) if key in index else positions
+        return index
+
+    def build_indexes(self):
+        """Chỉ mục vị trí dòng của self.df theo Student_ID, tên giảng viên chuẩn hóa và Subject_ID.
+
+        Các hàm tra cứu dùng chỉ mục này thay vì lọc toàn bộ bảng (chi phí theo kích thước nhóm).
+        """
+        self.student_index = self._group_positions(self.df['Student_ID'])
+        self.lecturer_index = self._group_positions(self.df['Lecturer_Name'], self.normalize_lecturer)
+        self.subject_index = self._group_positions(self.df['Subject_ID'])
+
+    def refresh_data(self, df=None):
+        """Cập nhật sau khi bảng điểm được nối thêm dòng (hoặc thay bằng ``df``).
+
+        Chỉ mục được dựng lại; bảng thống kê chỉ gộp thêm các dòng mới, hoặc tính lại toàn bộ
+        nếu các dòng cũ bị sửa/thay (xem StatsTables.refresh; khi truyền ``df`` mới thì kiểm tra
+        toàn bộ các dòng cũ).
+        """
+        if df is not None:
+            self.df = df
+        self._feature_matrix = None
+        self.build_indexes()
+        self.data_loader.invalidate_option_index()
+        if self.stats.refresh(self.df, full_check=df is not None):
+            print(f"✅ Statistics tables refreshed (version {self.stats.version}, {self.stats.rows} rows)")
+
+    def student_rows(self, student_id):
+        """Các dòng của sinh viên (thứ tự như self.df)"""
+        return self.df.iloc[self.student_index.get(str(student_id), [])]
+
+    def lecturer_rows(self, lecturer, exact=False):
+        """Các dòng của giảng viên (không phân biệt hoa thường; exact=True: đúng tên)"""
+        rows = self.df.iloc[self.lecturer_index.get(self.normalize_lecturer(lecturer), [])]
+        return rows[rows['Lecturer_Name'] == lecturer] if exact else rows
+
+    def subject_rows(self, subject_id):
+        """Các dòng của môn học"""
+        return self.df.iloc[self.subject_index.get(str(subject_id), [])]
 
     def get_student_info(self, student_id):
         """Get student information"""
-        # Thử tìm với kiểu dữ liệu khác nhau
-        student_data = self.df[self.df['Student_ID'] == str(student_id)]
-        if len(student_data) == 0:
-            # Thử với kiểu int
-            try:
-                student_id_int = int(student_id)
-                student_data = self.df[self.df['Student_ID'] == student_id_int]
-            except ValueError:
-                pass
-        
+        student_data = self.student_rows(student_id)
         if len(student_data) > 0:
             return student_data[['Student_ID', 'FirstName', 'LastName', 'Major_Name']].drop_duplicates()
         return None
@@ -61,7 +120,7 @@ class Predictor:
 
     def get_student_history(self, student_id):
         """Get detailed student history"""
-        student_data = self.df[self.df['Student_ID'] == str(student_id)]
+        student_data = self.student_rows(student_id)
         
         if len(student_data) == 0:
             return None
@@ -102,41 +161,15 @@ class Predictor:
 
     def get_subject_stats(self, subject_id):
         """Get subject statistics"""
-        subject_data = self.df[self.df['Subject_ID'] == str(subject_id)]
-        
-        if len(subject_data) == 0:
-            return None
-        
-        total_students = len(subject_data)
-        passed_students = sum(subject_data['passed'] == 1)
-        avg_score = subject_data['exam_score_6'].mean()
-        pass_rate = passed_students / total_students if total_students > 0 else 0
-        
-        return {
-            'total_students': total_students,
-            'passed_students': passed_students,
-            'avg_score': avg_score,
-            'pass_rate': pass_rate
-        }
+        return self.stats.subject_stats(subject_id)
 
     def get_lecturer_stats(self, lecturer):
         """Get lecturer statistics"""
-        lecturer_data = self.df[self.df['Lecturer_Name'] == lecturer]
-        
-        if len(lecturer_data) == 0:
-            return None
-        
-        total_students = len(lecturer_data)
-        passed_students = sum(lecturer_data['passed'] == 1)
-        avg_score = lecturer_data['exam_score_6'].mean()
-        pass_rate = passed_students / total_students if total_students > 0 else 0
-        
-        return {
-            'total_students': total_students,
-            'passed_students': passed_students,
-            'avg_score': avg_score,
-            'pass_rate': pass_rate
-        }
+        return self.stats.lecturer_stats(lecturer)
+
+    def get_lecturer_subject_stats(self, lecturer, subject_id):
+        """Get statistics of a lecturer teaching a subject"""
+        return self.stats.lecturer_subject_stats(lecturer, subject_id)
 
     def get_risk_assessment(self, history):
         """Get risk assessment based on student history"""
@@ -165,20 +198,12 @@ class Predictor:
         recommendations = []
         
         # Get student data
-        student_data = self.df[self.df['Student_ID'] == str(student_id)]
-        if len(student_data) == 0:
-            # Thử với kiểu int
-            try:
-                student_id_int = int(student_id)
-                student_data = self.df[self.df['Student_ID'] == student_id_int]
-            except ValueError:
-                pass
-        
+        student_data = self.student_rows(student_id)
         if len(student_data) == 0:
             return reasons, recommendations
         
-        # Get lecturer data
-        lecturer_data = self.df[self.df['Lecturer_Name'].str.lower() == lecturer.lower()]
+        # Get lecturer statistics (case-insensitive name)
+        lecturer_stats = self.stats.lecturer_stats(lecturer, exact=False)
         
         # 1. Student performance factors
         student_avg_score = student_data['exam_score_6'].mean()
@@ -199,10 +224,10 @@ class Predictor:
             })
         
         # 2. Lecturer factors - Thêm phân tích giáo viên mới
-        if len(lecturer_data) > 0:
-            lecturer_avg_score = lecturer_data['exam_score_6'].mean()
-            lecturer_pass_rate = lecturer_data['passed'].mean()
-            lecturer_student_count = len(lecturer_data)
+        if lecturer_stats is not None:
+            lecturer_avg_score = lecturer_stats['avg_score']
+            lecturer_pass_rate = lecturer_stats['pass_rate']
+            lecturer_student_count = lecturer_stats['total_students']
             
             # Kiểm tra xem có phải giáo viên mới không (dựa trên số lượng sinh viên ít)
             is_new_lecturer = lecturer_student_count < 10  # Dưới 10 sinh viên được coi là giáo viên mới
@@ -246,10 +271,10 @@ class Predictor:
             })
         
         # 3. Subject factors
-        subject_data = self.df[self.df['Subject_ID'] == subject_id]
-        if len(subject_data) > 0:
-            subject_avg_score = subject_data['exam_score_6'].mean()
-            subject_pass_rate = subject_data['passed'].mean()
+        subject_stats = self.stats.subject_stats(subject_id)
+        if subject_stats is not None:
+            subject_avg_score = subject_stats['avg_score']
+            subject_pass_rate = subject_stats['pass_rate']
             
             if subject_avg_score < 3.5:
                 reasons.append({
@@ -539,21 +564,12 @@ class Predictor:
             lecturer_stats = self.get_lecturer_stats(lecturer)
             
             # Prepare input features
-            input_data = self.df[(self.df['Student_ID'] == str(student_id)) & 
-                               (self.df['Lecturer_Name'] == lecturer) & 
-                               (self.df['Subject_ID'] == str(subject_id))]
+            student_data = self.student_rows(student_id)
+            input_data = student_data[(student_data['Lecturer_Name'] == lecturer) &
+                                      (student_data['Subject_ID'] == str(subject_id))]
             
             if len(input_data) == 0:
                 # Create synthetic data for prediction
-                student_data = self.df[(self.df['Student_ID'] == str(student_id))]
-                if len(student_data) == 0:
-                    # Thử với kiểu int
-                    try:
-                        student_id_int = int(student_id)
-                        student_data = self.df[self.df['Student_ID'] == student_id_int]
-                    except ValueError:
-                        pass
-                
                 if len(student_data) > 0:
                     input_data = student_data.iloc[:1].copy()
                     input_data['Lecturer_Name'] = lecturer
@@ -624,9 +640,96 @@ class Predictor:
         except Exception as e:
             return {'error': True, 'message': f'Prediction error: {str(e)}'}
 
+    def feature_matrix(self):
+        """Ma trận feature (float64) của toàn bộ self.df, chuyển đổi giống safe_float trong predict"""
+        if self._feature_matrix is None:
+            columns = []
+            for name in self.data_loader.feature_names:
+                col = self.df[name]
+                if pd.api.types.is_numeric_dtype(col) and not pd.api.types.is_bool_dtype(col):
+                    columns.append(col.to_numpy(dtype=np.float64, na_value=0.0))
+                else:
+                    # Mixed/text columns: convert each distinct value once
+                    codes, uniques = pd.factorize(col)
+                    values = np.array([safe_float(v) for v in uniques] + [0.0])
+                    columns.append(values[codes])  # code -1 (NaN) -> last entry (0.0)
+            self._feature_matrix = np.column_stack(columns)
+        return self._feature_matrix
+
+    def predict_many(self, triples, batch_size=PREDICT_BATCH_SIZE):
+        """Dự đoán hàng loạt cho nhiều bộ (student_id, lecturer, subject_id).
+
+        ``triples`` là DataFrame có các cột BATCH_COLUMNS hoặc danh sách tuple. Ma trận feature
+        được ghép vector hóa (dòng lịch sử trùng cả bộ ba, nếu không thì dòng đầu của sinh viên với
+        encoding giảng viên/môn học thay thế như predict); mỗi dòng feature khác nhau chỉ được dự đoán
+        một lần, predict_proba của ensemble sklearn chạy theo lô ``batch_size``.
+        Trả về DataFrame cùng thứ tự đầu vào: prob_pass, predicted_score, risk_level, source
+        ('history'/'synthetic'), error, message. Điểm giống predict cho từng bộ.
+        """
+        if isinstance(triples, pd.DataFrame):
+            requests = triples[BATCH_COLUMNS].astype(str).reset_index(drop=True)
+        else:
+            requests = pd.DataFrame([tuple(map(str, t)) for t in triples], columns=BATCH_COLUMNS)
+        n = len(requests)
+        keys = pd.DataFrame({
+            'student_id': self.df['Student_ID'].astype(str).to_numpy(),
+            'lecturer': self.df['Lecturer_Name'].astype(str).to_numpy(),
+            'subject_id': self.df['Subject_ID'].astype(str).to_numpy(),
+            'position': np.arange(len(self.df))
+        })
+
+        # First history row of each student and of each exact (student, lecturer, subject) triple
+        student_first = keys.drop_duplicates('student_id').set_index('student_id')['position']
+        triple_first = keys.drop_duplicates(BATCH_COLUMNS)
+        student_pos = requests['student_id'].map(student_first).to_numpy()
+        triple_pos = requests.merge(triple_first, on=BATCH_COLUMNS, how='left')['position'].to_numpy()
+
+        student_ok = ~np.isnan(student_pos)
+        subject_ok = requests['subject_id'].isin(set(keys['subject_id'])).to_numpy()
+        valid = student_ok & subject_ok
+        synthetic = valid & np.isnan(triple_pos)
+        positions = np.where(np.isnan(triple_pos), student_pos, triple_pos)[valid].astype(np.intp)
+
+        # Synthetic rows: student's first row with the requested lecturer/subject encodings
+        X = self.feature_matrix()[positions]
+        feature_names = list(self.data_loader.feature_names)
+        synthetic_rows = synthetic[valid]
+        if synthetic_rows.any():
+            lecturers = requests['lecturer'].to_numpy()[synthetic]
+            subjects = requests['subject_id'].to_numpy()[synthetic]
+            lecturer_codes = {c: i for i, c in enumerate(self.data_loader.le_lecturer.classes_)}
+            subject_codes = {c: i for i, c in enumerate(self.data_loader.le_subject.classes_)}
+            new_lecturers = sorted({l for l in lecturers if l not in lecturer_codes})
+            if new_lecturers:
+                print(f"⚠️ {len(new_lecturers)} giảng viên mới - sử dụng encoding mặc định: {', '.join(new_lecturers[:5])}")
+            if 'lecturer_encoded' in feature_names:
+                X[synthetic_rows, feature_names.index('lecturer_encoded')] = [lecturer_codes.get(l, 0) for l in lecturers]
+            if 'subject_encoded' in feature_names:
+                X[synthetic_rows, feature_names.index('subject_encoded')] = [subject_codes[s] for s in subjects]
+
+        # Score each distinct feature row once
+        prob_pass = np.full(n, np.nan)
+        if len(X):
+            X, inverse = np.unique(X, axis=0, return_inverse=True)
+            scores = np.concatenate([
+                self.batch_model.predict_proba(pd.DataFrame(X[i:i + batch_size], columns=feature_names))[:, 1]
+                for i in range(0, len(X), batch_size)
+            ])
+            prob_pass[valid] = scores[inverse.ravel()]
+
+        results = requests.copy()
+        results['prob_pass'] = prob_pass
+        results['predicted_score'] = prob_pass * 6.0
+        results['risk_level'] = pd.Series(1 - prob_pass).map(self.get_risk_level).where(valid, None)
+        results['source'] = np.where(valid, np.where(synthetic, 'synthetic', 'history'), None)
+        results['error'] = ~valid
+        results['message'] = np.where(~student_ok, 'Invalid student ID',
+                                      np.where(~subject_ok, 'Invalid subject ID', ''))
+        return results
+
     def print_student_demographic_summary(self, student_id):
         """Print student demographic summary"""
-        student_data = self.df[self.df['Student_ID'] == str(student_id)]
+        student_data = self.student_rows(student_id)
         if len(student_data) == 0:
             print("❌ Không tìm thấy dữ liệu sinh viên!")
             return
@@ -671,7 +774,7 @@ class Predictor:
 
     def print_student_conduct_summary(self, student_id):
         """Print student conduct summary"""
-        student_data = self.df[self.df['Student_ID'] == str(student_id)]
+        student_data = self.student_rows(student_id)
         if len(student_data) == 0:
             print("❌ Không tìm thấy dữ liệu sinh viên!")
             return
@@ -843,15 +946,17 @@ class Predictor:
 class CLOPredictor:
     """CLO Prediction System Main Class"""
     
-    def __init__(self, optimize_params=False):
-        """Initialize the CLO prediction system"""
+    def __init__(self, optimize_params=False, profile=None):
+        """Initialize the CLO prediction system (profile=True ghi báo cáo thời gian/bộ nhớ từng stage)"""
         print("Initializing CLO Prediction System...")
         
         # Initialize components
+        from .config import PROFILE_PIPELINE
         from .data_loader import DataLoader
         from .data_integration import DataIntegration
         from .feature_engineering import FeatureEngineering
         from .model_trainer import ModelTrainer
+        from .profiling import StageProfiler
         
         self.data_loader = DataLoader()
         self.data_integration = None
@@ -859,74 +964,159 @@ class CLOPredictor:
         self.model_trainer = None
         self.predictor = None
         self.optimize_params = optimize_params
+        self.data_key = None  # Fingerprint of inputs + feature code (set in load_and_prepare_data)
         self.reasons_predictor = None  # Will be set from main.py
+        self.profiler = StageProfiler(PROFILE_PIPELINE if profile is None else profile)
+        self.profile_report = None
         
         # Load and prepare data
-        self.load_and_prepare_data()
+        with self.profiler.stage('load_and_prepare_data', rows=self._row_count):
+            self.load_and_prepare_data()
         
         # Train models
-        self.train_models()
+        with self.profiler.stage('train_models', rows=self._row_count):
+            self.train_models()
+        
+        if self.profiler.enabled:
+            self.profiler.print_summary()
+            self.profile_report = self.profiler.write_report()
+
+    def _row_count(self, frame=None):
+        """Số dòng của DataFrame (mặc định bảng điểm chính) cho báo cáo profiling"""
+        frame = self.data_loader.df if frame is None else frame
+        return len(frame) if frame is not None else None
 
     def load_and_prepare_data(self):
         """Load and prepare all data"""
         print("=== LOADING AND PREPARING DATA ===")
+        stage = self.profiler.stage
+        loader = self.data_loader
+        
+        # Reuse the engineered features if inputs and feature code are unchanged
+        from .config import USE_FEATURE_STORE, USE_MODEL_ARTIFACT
+        from .feature_store import feature_store_key, load_feature_store, save_feature_store
+        with stage('feature_store_key'):
+            store_key = feature_store_key() if USE_FEATURE_STORE or USE_MODEL_ARTIFACT else None
+        self.data_key = store_key
+        if USE_FEATURE_STORE:
+            with stage('load_feature_store', rows=self._row_count):
+                loaded = load_feature_store(self.data_loader, store_key)
+            if loaded:
+                return
+        
+        # Read all workbooks up front (concurrently when parallel loading is enabled)
+        with stage('prefetch_sources'):
+            self.data_loader.prefetch_sources()
         
         # Load main data
-        self.data_loader.load_main_data()
-        self.data_loader.process_main_data()
+        with stage('load_main_data', rows=self._row_count):
+            self.data_loader.load_main_data()
+        with stage('process_main_data', rows=self._row_count):
+            self.data_loader.process_main_data()
         
         # Load additional data
-        self.data_loader.load_demographic_data()
-        self.data_loader.load_conduct_data()
-        self.data_loader.load_self_study_data()
+        with stage('load_demographic_data', rows=lambda: self._row_count(loader.nhankhau_df)):
+            self.data_loader.load_demographic_data()
+        with stage('load_conduct_data', rows=lambda: self._row_count(loader.conduct_df)):
+            self.data_loader.load_conduct_data()
+        with stage('load_self_study_data', rows=lambda: self._row_count(loader.tuhoc_df)):
+            self.data_loader.load_self_study_data()
         
         # Initialize data integration
         from .data_integration import DataIntegration
         self.data_integration = DataIntegration(self.data_loader)
         
         # Integrate all data
-        self.data_integration.integrate_demographic_data()
-        self.data_integration.integrate_conduct_data()
-        self.data_integration.integrate_self_study_data()
+        with stage('integrate_demographic_data', rows=self._row_count):
+            self.data_integration.integrate_demographic_data()
+        with stage('integrate_conduct_data', rows=self._row_count):
+            self.data_integration.integrate_conduct_data()
+        with stage('integrate_self_study_data', rows=self._row_count):
+            self.data_integration.integrate_self_study_data()
         
         # Create features
-        self.data_integration.create_teaching_method_features()
-        self.data_integration.create_assessment_method_features()
+        with stage('create_teaching_method_features', rows=self._row_count):
+            self.data_integration.create_teaching_method_features()
+        with stage('create_assessment_method_features', rows=self._row_count):
+            self.data_integration.create_assessment_method_features()
         
         # Initialize feature engineering
         from .feature_engineering import FeatureEngineering
         self.feature_engineering = FeatureEngineering(self.data_loader)
         
         # Add advanced features
-        self.feature_engineering.add_student_history_features()
-        self.feature_engineering.add_advanced_student_features()
-        self.feature_engineering.add_personalized_features()
+        with stage('add_student_history_features', rows=self._row_count):
+            self.feature_engineering.add_student_history_features()
+        with stage('add_advanced_student_features', rows=self._row_count):
+            self.feature_engineering.add_advanced_student_features()
+        with stage('add_personalized_features', rows=self._row_count):
+            self.feature_engineering.add_personalized_features()
         
         # Finalize features
-        self.data_integration.finalize_features()
+        with stage('finalize_features', rows=self._row_count):
+            self.data_integration.finalize_features()
         
         # Print demographic statistics
         self.feature_engineering.print_demographic_statistics()
+        
+        if USE_FEATURE_STORE:
+            with stage('save_feature_store'):
+                save_feature_store(self.data_loader, store_key)
 
     def train_models(self):
         """Train the prediction models"""
         print("\n=== TRAINING MODELS ===")
+        stage = self.profiler.stage
         
         # Initialize model trainer
         from .model_trainer import ModelTrainer
-        self.model_trainer = ModelTrainer(self.data_loader)
+        self.model_trainer = ModelTrainer(self.data_loader, profiler=self.profiler)
         
         # Prepare data for training
-        self.model_trainer.prepare_data()
-        
-        # Train models (tối ưu tham số nếu được yêu cầu)
-        training_results = self.model_trainer.train_models(optimize_params=self.optimize_params)
+        with stage('prepare_data', rows=self._row_count):
+            self.model_trainer.prepare_data()
+        
+        # Reuse the saved ensemble if data, features and training config are unchanged
+        from .config import USE_MODEL_ARTIFACT, INCREMENTAL_TRAINING, COMPACT_PREDICT
+        from .model_store import model_artifact_key, load_model_artifact, save_model_artifact, load_incremental_base
+        artifact_key = model_artifact_key(self.optimize_params, self.data_key) if USE_MODEL_ARTIFACT else None
+        loaded = False
+        if USE_MODEL_ARTIFACT:
+            with stage('load_model_artifact'):
+                loaded = load_model_artifact(self.model_trainer, artifact_key)
+        if loaded:
+            self.model_trainer.convert_features()
+        else:
+            # Only new terms were appended: grow the saved ensemble instead of retraining from scratch
+            training_results = None
+            previous = load_incremental_base(self.model_trainer, self.optimize_params) \
+                if USE_MODEL_ARTIFACT and INCREMENTAL_TRAINING else None
+            if previous is not None:
+                with stage('update_models', rows=self._row_count):
+                    training_results = self.model_trainer.update_models(
+                        previous['model'], previous['encoders'], previous['trained_through']
+                    )
+            
+            # Train models (tối ưu tham số nếu được yêu cầu)
+            if training_results is None:
+                with stage('train_ensemble', rows=self._row_count):
+                    training_results = self.model_trainer.train_models(optimize_params=self.optimize_params)
+            
+            # Evaluate model
+            with stage('evaluate_model'):
+                evaluation_results = self.model_trainer.evaluate_model()
+            
+            if USE_MODEL_ARTIFACT:
+                with stage('save_model_artifact'):
+                    save_model_artifact(self.model_trainer, artifact_key, training_results, self.optimize_params)
         
-        # Evaluate model
-        evaluation_results = self.model_trainer.evaluate_model()
+        if COMPACT_PREDICT:
+            with stage('export_compact_model'):
+                self.model_trainer.export_compact_model()
         
         # Initialize predictor
-        self.predictor = Predictor(self.data_loader, self.model_trainer)
+        with stage('init_predictor'):
+            self.predictor = Predictor(self.data_loader, self.model_trainer)
         
         print("Model training completed!")
 
@@ -937,6 +1127,14 @@ class CLOPredictor:
     def validate_input(self, input_type, value):
         """Validate input against available options"""
         return self.data_loader.validate_input(input_type, value)
+
+    def resolve_input(self, input_type, value):
+        """Chuẩn hóa giá trị nhập (không phân biệt dấu, hoa thường; môn học theo mã hoặc tên)"""
+        return self.data_loader.resolve_input(input_type, value)
+
+    def suggest_options(self, input_type, value, limit=5):
+        """Gợi ý giá trị hợp lệ gần đúng với giá trị nhập"""
+        return self.data_loader.suggest_options(input_type, value, limit)
     
     def get_subject_name(self, subject_id):
         """Lấy tên môn học từ mã môn học"""
@@ -987,6 +1185,8 @@ class CLOPredictor:
             'BSC0050': 'Chủ nghĩa Mác - Lênin'
         }
         
+        if subject_id in self.data_loader.subject_names:
+            return self.data_loader.subject_names[subject_id]
         return subject_mapping.get(subject_id, f'Môn học {subject_id}')
 
     def display_available_options(self):
@@ -1005,6 +1205,10 @@ class CLOPredictor:
             print(f"❌ Lỗi khi dự đoán: {e}")
             return None
 
+    def predict_many(self, triples, batch_size=PREDICT_BATCH_SIZE):
+        """Dự đoán hàng loạt (xem Predictor.predict_many)"""
+        return self.predictor.predict_many(triples, batch_size)
+
     def analyze_prediction_reasons(self, student_id, lecturer, subject_id, predicted_score):
         """Analyze reasons for prediction and provide recommendations"""
         try:
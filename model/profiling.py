@@ -0,0 +1,168 @@
+import os
+import sys
+import json
+import time
+import platform
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from .config import PROFILE_PIPELINE, PROFILE_MEMORY, PROFILE_REPORT_DIR
+
+# What cpu_s covers: os.times() only reports child processes once they have exited and been waited
+# for, so pooled workers that outlive a stage (e.g. reused joblib/loky workers) are not included
+CPU_SCOPE = 'process + exited child processes (excludes reused joblib/loky workers)'
+
+
+def _cpu_times():
+    """(CPU của tiến trình hiện tại, CPU của các tiến trình con đã kết thúc) tính bằng giây"""
+    times = os.times()
+    return time.process_time(), times.children_user + times.children_system
+
+
+class StageProfiler:
+    """Đo từng giai đoạn của pipeline: wall time, CPU time, peak bộ nhớ (tracemalloc) và số dòng.
+
+    ``cpu_s`` gồm CPU của tiến trình và của các tiến trình con (ProcessPoolExecutor...) đã kết thúc
+    trong stage (``cpu_children_s``); xem CPU_SCOPE.
+
+    Dùng ``with profiler.stage('tên', rows=lambda: len(df)):``; các stage lồng nhau được ghi
+    với tên dạng 'cha/con'. Khi ``enabled`` là False mọi stage là no-op.
+    """
+
+    def __init__(self, enabled=PROFILE_PIPELINE, track_memory=PROFILE_MEMORY):
+        self.enabled = enabled
+        self.track_memory = enabled and track_memory
+        self.stages = []
+        self._stack = []
+        self._started_tracemalloc = False
+        self._start_time = None
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        """Context manager đo một stage. ``rows`` là số dòng hoặc hàm trả về số dòng (gọi khi kết thúc)"""
+        if not self.enabled:
+            yield
+            return
+        if self._start_time is None:
+            self._start_time = time.perf_counter()
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+        full_name = '/'.join([frame['name'] for frame in self._stack] + [name])
+        repeats = sum(1 for record in self.stages if record['stage'].split('#')[0] == full_name)
+        if repeats:
+            full_name = f'{full_name}#{repeats + 1}'  # Keep stage names unique for diff_reports
+        frame = {'name': name, 'child_peak': 0}
+        mem_start = 0
+        if self.track_memory:
+            mem_start, outer_peak = tracemalloc.get_traced_memory()
+            # The tracemalloc peak is global: remember the enclosing stage's peak before resetting it
+            if self._stack:
+                self._stack[-1]['child_peak'] = max(self._stack[-1]['child_peak'], outer_peak)
+            tracemalloc.reset_peak()
+        self._stack.append(frame)
+        record = {'stage': full_name, 'depth': len(self._stack) - 1, 'status': 'ok'}
+        self.stages.append(record)  # In start order; filled in when the stage ends
+        wall_start, (cpu_start, children_start) = time.perf_counter(), _cpu_times()
+        try:
+            yield
+        except BaseException:
+            record['status'] = 'error'
+            raise
+        finally:
+            record['wall_s'] = round(time.perf_counter() - wall_start, 4)
+            cpu_end, children_end = _cpu_times()
+            record['cpu_children_s'] = round(children_end - children_start, 4)
+            record['cpu_s'] = round(cpu_end - cpu_start + children_end - children_start, 4)
+            self._stack.pop()
+            if self.track_memory:
+                peak = max(tracemalloc.get_traced_memory()[1], frame['child_peak'])
+                record['peak_mb'] = round(max(peak - mem_start, 0) / 2 ** 20, 2)
+                if self._stack:
+                    self._stack[-1]['child_peak'] = max(self._stack[-1]['child_peak'], peak)
+            record['rows'] = _row_count(rows)
+
+    def report(self):
+        """Báo cáo dạng dict (các stage theo thứ tự bắt đầu, kèm thông tin môi trường chạy)"""
+        return {
+            'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'track_memory': self.track_memory,
+            'cpu_scope': CPU_SCOPE,
+            'total_wall_s': round(time.perf_counter() - self._start_time, 4) if self._start_time else 0.0,
+            'stages': list(self.stages)
+        }
+
+    def write_report(self, path=None):
+        """Ghi báo cáo JSON (mặc định PROFILE_REPORT_DIR/run_<thời gian>.json) và dừng tracemalloc"""
+        if not self.enabled:
+            return None
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        path = path or os.path.join(PROFILE_REPORT_DIR, f"run_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2, ensure_ascii=False)
+        print(f"Saved profile report: {path}")
+        return path
+
+    def print_summary(self):
+        """In bảng thời gian/bộ nhớ của các stage"""
+        if not self.enabled:
+            return
+        print(f"\n{'Stage':60} {'Wall (s)':>9} {'CPU (s)':>9} {'Peak MB':>9} {'Rows':>9}")
+        for record in self.stages:
+            name = '  ' * record['depth'] + record['stage'].rsplit('/', 1)[-1]
+            peak = f"{record['peak_mb']:9.1f}" if 'peak_mb' in record else f"{'-':>9}"
+            rows = f"{record['rows']:9}" if record['rows'] is not None else f"{'-':>9}"
+            print(f"{name[:60]:60} {record['wall_s']:9.2f} {record['cpu_s']:9.2f} {peak} {rows}")
+        print(f"CPU: {CPU_SCOPE}")
+
+
+def _row_count(rows):
+    """Số dòng của stage (None nếu không có hoặc không tính được)"""
+    if callable(rows):
+        try:
+            rows = rows()
+        except Exception:
+            return None
+    return int(rows) if rows is not None else None
+
+
+def load_report(path):
+    """Đọc một báo cáo JSON do write_report ghi"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def diff_reports(old, new, threshold=0.10, min_seconds=0.05):
+    """So sánh hai báo cáo theo tên stage.
+
+    Trả về danh sách dict (stage, old/new wall, cpu, peak, rows, thay đổi wall tương đối, regression).
+    Một stage là regression nếu wall time tăng quá ``threshold`` (tỉ lệ) và quá ``min_seconds``.
+    """
+    old_stages = {record['stage']: record for record in old['stages']}
+    new_stages = {record['stage']: record for record in new['stages']}
+    names = [record['stage'] for record in new['stages']]
+    names += [name for name in old_stages if name not in new_stages]
+    rows = []
+    for name in names:
+        before, after = old_stages.get(name), new_stages.get(name)
+        row = {'stage': name, 'depth': (after or before)['depth']}
+        for field in ('wall_s', 'cpu_s', 'peak_mb', 'rows'):
+            row[f'old_{field}'] = before.get(field) if before else None
+            row[f'new_{field}'] = after.get(field) if after else None
+        old_wall, new_wall = row['old_wall_s'], row['new_wall_s']
+        if old_wall is not None and new_wall is not None:
+            row['wall_change'] = (new_wall - old_wall) / old_wall if old_wall > 0 else None
+            row['regression'] = (new_wall - old_wall > min_seconds
+                                 and (old_wall == 0 or (new_wall - old_wall) / old_wall > threshold))
+        else:
+            row['wall_change'] = None
+            row['regression'] = False
+        rows.append(row)
+    return rows
@@ -0,0 +1,152 @@
+import os
+import copy
+import json
+import pickle
+import numpy as np
+import pandas as pd
+from .config import REASONS_COMPACT_ESTIMATORS
+from .tree_export import export_compact_estimator
+
+# Columns of the reasons/solutions datasets needed at prediction time
+STORE_COLUMNS = ['reason_text', 'solution_text']
+STORE_VERSION = 1
+
+
+class ReasonStore:
+    """Kho reason/solution dạng cột trên đĩa, mở lười (memory-mapped) khi truy cập lần đầu.
+
+    Mỗi dataset gồm mã severity (int16, theo thứ tự dòng gốc) và mỗi cột văn bản là một
+    blob UTF-8 cùng mảng offsets. Chỉ ``index.json`` được đọc khi khởi tạo.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._index = None
+        self._opened = {}
+
+    def __getstate__(self):
+        # Pickle only the location; memory maps are reopened on demand
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'])
+
+    def relocate(self, path):
+        """Trỏ kho sang thư mục khác (ví dụ khi thư mục model được di chuyển)"""
+        self.__init__(path)
+
+    @property
+    def index(self):
+        if self._index is None:
+            with open(os.path.join(self.path, 'index.json'), 'r', encoding='utf-8') as f:
+                self._index = json.load(f)
+        return self._index
+
+    @property
+    def datasets(self):
+        return list(self.index['datasets'])
+
+    def num_rows(self, dataset_key):
+        return self.index['datasets'][dataset_key]['rows']
+
+    def _open(self, dataset_key):
+        if dataset_key not in self._opened:
+            prefix = os.path.join(self.path, dataset_key)
+            info = self.index['datasets'][dataset_key]
+            columns = {}
+            for col in info['columns']:
+                offsets = np.load(f'{prefix}.{col}.offsets.npy', mmap_mode='r')
+                blob = np.memmap(f'{prefix}.{col}.bin', dtype=np.uint8, mode='r') if offsets[-1] else np.empty(0, np.uint8)
+                nulls = np.load(f'{prefix}.{col}.nulls.npy') if col in info['null_columns'] else None
+                columns[col] = (offsets, blob, nulls)
+            self._opened[dataset_key] = (np.load(f'{prefix}.severity.npy', mmap_mode='r'), columns)
+        return self._opened[dataset_key]
+
+    def positions(self, dataset_key, severity_label):
+        """Vị trí (theo thứ tự dòng gốc) các dòng có severity_level bằng severity_label"""
+        labels = self.index['datasets'][dataset_key]['severity_labels']
+        if severity_label not in labels:
+            return np.empty(0, dtype=np.intp)
+        codes, _ = self._open(dataset_key)
+        return np.flatnonzero(codes == labels.index(severity_label))
+
+    def text(self, dataset_key, column, position):
+        """Giá trị của ô (dataset, cột, vị trí dòng); NaN nếu ô gốc trống"""
+        offsets, blob, nulls = self._open(dataset_key)[1][column]
+        if nulls is not None and nulls[position]:
+            return np.nan
+        return bytes(blob[offsets[position]:offsets[position + 1]]).decode('utf-8')
+
+
+def write_reason_store(path, frames):
+    """Ghi các DataFrame reasons/solutions ({dataset_key: df}) thành ReasonStore tại ``path``"""
+    os.makedirs(path, exist_ok=True)
+    index = {'version': STORE_VERSION, 'datasets': {}}
+    for key, df in frames.items():
+        prefix = os.path.join(path, key)
+        severity = df['severity_level'].astype(object)
+        labels = sorted(severity.dropna().unique().tolist(), key=str)
+        codes = pd.Categorical(severity, categories=labels).codes.astype(np.int16)
+        np.save(f'{prefix}.severity.npy', codes)
+        columns = [col for col in STORE_COLUMNS if col in df.columns]
+        null_columns = []
+        for col in columns:
+            values = df[col]
+            encoded = [str(value).encode('utf-8') if pd.notna(value) else b'' for value in values]
+            offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+            offsets[1:] = np.cumsum([len(value) for value in encoded])
+            np.save(f'{prefix}.{col}.offsets.npy', offsets)
+            with open(f'{prefix}.{col}.bin', 'wb') as f:
+                f.write(b''.join(encoded))
+            if values.isna().any():
+                np.save(f'{prefix}.{col}.nulls.npy', values.isna().to_numpy())
+                null_columns.append(col)
+        index['datasets'][key] = {
+            'rows': len(df), 'severity_labels': labels, 'columns': columns, 'null_columns': null_columns
+        }
+    with open(os.path.join(path, 'index.json'), 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+    return ReasonStore(path)
+
+
+def _lean_estimator(estimator, compact):
+    """Estimator để lưu: bản CompactTreeEnsemble (mảng node) nếu compact và xuất được, ngược lại giữ nguyên"""
+    if not compact:
+        return estimator
+    try:
+        return export_compact_estimator(estimator)
+    except ValueError:
+        return estimator
+
+
+def save_reasons_model(model, output_dir, name, compact=REASONS_COMPACT_ESTIMATORS):
+    """Lưu UnifiedReasonsSolutionsModel thành file estimator gọn ({name}.pkl) + ReasonStore (reason_store/).
+
+    Các DataFrame (datasets và bản 'data' trong models) không được pickle; văn bản reason/solution
+    nằm trong kho dạng cột và chỉ được mở khi dự đoán lần đầu. Với ``compact`` các cây được lưu
+    dạng mảng node (model/tree_export.py). Trả về đường dẫn file pickle.
+    """
+    frames = {key: info['data'] for key, info in model.models.items() if 'data' in info}
+    store = write_reason_store(os.path.join(output_dir, 'reason_store'), frames)
+    lean = copy.copy(model)
+    lean.datasets = {}
+    lean.dataset_sizes = {key: len(df) for key, df in model.datasets.items()} or dict(model.dataset_sizes)
+    lean.models = {
+        key: {**{k: v for k, v in info.items() if k != 'data'}, 'model': _lean_estimator(info['model'], compact)}
+        for key, info in model.models.items()
+    }
+    lean.reason_store = store
+    model_path = os.path.join(output_dir, f'{name}.pkl')
+    with open(model_path, 'wb') as f:
+        pickle.dump(lean, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return model_path
+
+
+def load_reasons_model(model_path):
+    """Nạp model reasons/solutions; ReasonStore (nếu có) được trỏ về thư mục cạnh file pickle"""
+    with open(model_path, 'rb') as f:
+        model = pickle.load(f)
+    store = getattr(model, 'reason_store', None)
+    if store is not None:
+        store.relocate(os.path.join(os.path.dirname(model_path), 'reason_store'))
+    return model
@@ -0,0 +1,142 @@
+import hashlib
+import numpy as np
+import pandas as pd
+
+# Additive sums kept per group: rows, passed rows, sum and count of exam_score_6
+SUM_COLUMNS = ['rows', 'passed', 'score_sum', 'score_count']
+# Grade frame columns the tables are computed from
+SOURCE_COLUMNS = ['Lecturer_Name', 'Subject_ID', 'passed', 'exam_score_6']
+# Aggregated rows re-hashed by a refresh to check that the prefix is unchanged (full_check hashes all)
+VERIFY_SAMPLE = 64
+
+
+def _row_hashes(df):
+    """Hash từng dòng của các cột nguồn (uint64, theo giá trị nên không phụ thuộc mã category)"""
+    return pd.util.hash_pandas_object(df[SOURCE_COLUMNS], index=False).to_numpy()
+
+
+def _pair_sums(frame):
+    """Tổng theo (Lecturer_Name, Subject_ID) của một đoạn bảng điểm: {(giảng viên, môn): tuple tổng}"""
+    score = frame['exam_score_6'].astype(np.float64)
+    parts = pd.DataFrame({
+        'Lecturer_Name': frame['Lecturer_Name'],
+        'Subject_ID': frame['Subject_ID'],
+        'rows': 1,
+        'passed': (frame['passed'] == 1).astype(np.int64),
+        'score_sum': score.fillna(0.0),
+        'score_count': score.notna().astype(np.int64)
+    })
+    sums = parts.groupby(['Lecturer_Name', 'Subject_ID'], observed=True, sort=False)[SUM_COLUMNS].sum()
+    return dict(zip(sums.index, sums.itertuples(index=False, name=None)))
+
+
+def _add(table, key, sums):
+    current = table.get(key)
+    table[key] = sums if current is None else tuple(a + b for a, b in zip(current, sums))
+
+
+class StatsTables:
+    """Bảng thống kê tính sẵn theo môn học, giảng viên và (giảng viên, môn học).
+
+    Bảng điểm được gộp một lần (một groupby theo cặp giảng viên × môn học, rồi cộng dồn lên
+    từng môn / từng giảng viên); mỗi nhóm lưu các tổng cộng được nên ``refresh`` chỉ cần hash và gộp
+    các dòng mới nối thêm. ``version`` tăng sau mỗi lần cập nhật, ``rows`` là số dòng đã được gộp,
+    ``fingerprint`` là sha256 (cộng dồn) của hash các dòng đó.
+    """
+
+    def __init__(self, normalize_lecturer=str.lower):
+        self.normalize_lecturer = normalize_lecturer
+        self.clear()
+
+    def clear(self):
+        self.subject = {}
+        self.lecturer = {}
+        self.lecturer_subject = {}
+        self.lecturer_variants = {}  # normalized lecturer name -> exact names
+        self.rows = 0
+        self._row_hashes = np.empty(0, dtype=np.uint64)  # Buffer, the first self.rows entries are used
+        self._hasher = hashlib.sha256()
+        self.fingerprint = self._hasher.hexdigest()
+        self.version = 0
+
+    def build(self, df):
+        """Tính lại toàn bộ bảng từ bảng điểm"""
+        version = self.version
+        self.clear()
+        self.version = version
+        return self.refresh(df)
+
+    def _prefix_changed(self, df, full_check):
+        """Các dòng đã gộp có bị thay đổi không: so hash của dòng cuối và một mẫu cố định khoảng
+        VERIFY_SAMPLE dòng (xoay vòng theo version) với hash đã lưu; full_check so toàn bộ"""
+        if len(df) < self.rows:
+            return True
+        if self.rows == 0:
+            return False
+        if full_check:
+            positions = np.arange(self.rows)
+        else:
+            step = max(1, self.rows // VERIFY_SAMPLE)
+            positions = np.append(np.arange(self.version % step, self.rows, step), self.rows - 1)
+        return not np.array_equal(_row_hashes(df.iloc[positions]), self._row_hashes[positions])
+
+    def refresh(self, df, full_check=False):
+        """Gộp các dòng được nối thêm vào cuối bảng điểm kể từ lần cập nhật trước.
+
+        Chỉ các dòng mới được hash; các dòng đã gộp được kiểm tra theo mẫu (xem _prefix_changed),
+        ``full_check=True`` kiểm tra toàn bộ. Nếu các dòng đã gộp không còn nguyên vẹn (bảng ngắn
+        hơn, dòng cũ bị sửa hoặc bảng bị thay) thì tính lại toàn bộ. Trả về True nếu bảng thống kê thay đổi.
+        """
+        if self._prefix_changed(df, full_check):
+            return self.build(df)
+        if len(df) == self.rows:
+            return False
+        new_hashes = _row_hashes(df.iloc[self.rows:])
+        rows = self.rows + len(new_hashes)
+        if rows > len(self._row_hashes):  # Grow geometrically: appends cost O(new rows) amortized
+            buffer = np.empty(max(rows, 2 * len(self._row_hashes)), dtype=np.uint64)
+            buffer[:self.rows] = self._row_hashes[:self.rows]
+            self._row_hashes = buffer
+        self._row_hashes[self.rows:rows] = new_hashes
+        self._hasher.update(new_hashes.tobytes())
+        for (lecturer, subject), sums in _pair_sums(df.iloc[self.rows:]).items():
+            lecturer, subject = str(lecturer), str(subject)
+            _add(self.lecturer_subject, (lecturer, subject), sums)
+            _add(self.lecturer, lecturer, sums)
+            _add(self.subject, subject, sums)
+            self.lecturer_variants.setdefault(self.normalize_lecturer(lecturer), set()).add(lecturer)
+        self.rows = rows
+        self.fingerprint = self._hasher.hexdigest()
+        self.version += 1
+        return True
+
+    @staticmethod
+    def _stats(sums):
+        if sums is None:
+            return None
+        rows, passed, score_sum, score_count = sums
+        return {
+            'total_students': rows,
+            'passed_students': passed,
+            'avg_score': score_sum / score_count if score_count else np.nan,
+            'pass_rate': passed / rows if rows > 0 else 0
+        }
+
+    def subject_stats(self, subject_id):
+        """Thống kê của môn học (None nếu chưa có dữ liệu)"""
+        return self._stats(self.subject.get(str(subject_id)))
+
+    def lecturer_stats(self, lecturer, exact=True):
+        """Thống kê của giảng viên; exact=False gộp mọi tên trùng khi không phân biệt hoa thường"""
+        if exact:
+            return self._stats(self.lecturer.get(lecturer))
+        names = self.lecturer_variants.get(self.normalize_lecturer(lecturer), ())
+        sums = None
+        for name in names:
+            part = self.lecturer[name]
+            sums = part if sums is None else tuple(a + b for a, b in zip(sums, part))
+        return self._stats(sums)
+
+    def lecturer_subject_stats(self, lecturer, subject_id):
+        """Thống kê của giảng viên khi dạy môn học"""
+        return self._stats(self.lecturer_subject.get((lecturer, str(subject_id))))
@@ -0,0 +1,75 @@
+import unicodedata
+import numpy as np
+
+
+def normalize_text(text):
+    """Chuẩn hóa để so khớp: bỏ dấu tiếng Việt (kể cả đ -> d), không phân biệt hoa thường, gộp khoảng trắng"""
+    text = unicodedata.normalize('NFD', str(text).replace('đ', 'd').replace('Đ', 'D'))
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return ' '.join(text.casefold().split())
+
+
+class SuggestionIndex:
+    """Chỉ mục n-gram ký tự (mặc định trigram) trên các chuỗi đã chuẩn hóa để gợi ý giá trị gần đúng.
+
+    Mỗi giá trị có thể có thêm bí danh (ví dụ mã môn học kèm tên môn). Điểm của một ứng viên là
+    hệ số Dice giữa tập n-gram của truy vấn và của giá trị/bí danh; chỉ các ứng viên có chung
+    n-gram với truy vấn (theo danh sách ngược) được xét.
+    """
+
+    def __init__(self, values, aliases=None, n=3):
+        self.n = n
+        self.values = [str(v) for v in values]
+        aliases = aliases or {}
+        postings, alias_value, alias_size = {}, [], []
+        self.exact = {}  # normalized text -> value ids
+        for value_id, value in enumerate(self.values):
+            for text in [value] + [str(a) for a in aliases.get(value, ())]:
+                key = normalize_text(text)
+                if not key:
+                    continue
+                self.exact.setdefault(key, set()).add(value_id)
+                grams = self._grams(key)
+                for gram in grams:
+                    postings.setdefault(gram, []).append(len(alias_value))
+                alias_value.append(value_id)
+                alias_size.append(len(grams))
+        self.postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+        self.alias_value = np.array(alias_value, dtype=np.int32)
+        self.alias_size = np.array(alias_size, dtype=np.float64)
+
+    def _grams(self, key):
+        padded = f' {key} '
+        return {padded[i:i + self.n] for i in range(max(len(padded) - self.n + 1, 1))}
+
+    def __len__(self):
+        return len(self.values)
+
+    def scores(self, query):
+        """Điểm Dice (0-1) của truy vấn với từng bí danh"""
+        grams = self._grams(normalize_text(query))
+        hits = [self.postings[gram] for gram in grams if gram in self.postings]
+        if not hits:
+            return np.zeros(len(self.alias_value))
+        shared = np.bincount(np.concatenate(hits), minlength=len(self.alias_value))
+        return 2 * shared / (len(grams) + self.alias_size)
+
+    def suggest(self, query, k=5, cutoff=0.3):
+        """Tối đa k giá trị gần nhất với truy vấn (điểm >= cutoff), điểm giảm dần"""
+        scores = self.scores(query)
+        candidates = np.flatnonzero(scores >= cutoff)
+        order = candidates[np.argsort(-scores[candidates], kind='stable')]
+        result, seen = [], set()
+        for alias in order:
+            value_id = self.alias_value[alias]
+            if value_id not in seen:
+                seen.add(value_id)
+                result.append(self.values[value_id])
+                if len(result) == k:
+                    break
+        return result
+
+    def lookup(self, query):
+        """Giá trị duy nhất trùng truy vấn sau chuẩn hóa (không dấu, không phân biệt hoa thường), ngược lại None"""
+        ids = self.exact.get(normalize_text(query), ())
+        return self.values[next(iter(ids))] if len(ids) == 1 else None
@@ -0,0 +1,237 @@
+import numpy as np
+from scipy.special import expit, softmax
+from sklearn.ensemble import (
+    RandomForestClassifier, ExtraTreesClassifier, GradientBoostingClassifier, VotingClassifier
+)
+from sklearn.dummy import DummyClassifier
+
+# DummyClassifier strategies whose predict_proba does not depend on the input
+CONSTANT_INIT_STRATEGIES = ('prior', 'most_frequent', 'constant')
+
+
+class CompactTrees:
+    """Cây của một thành viên ensemble, trải phẳng thành các mảng node liên tục.
+
+    ``children[2 * node]``/``children[2 * node + 1]`` là con trái/phải, node lá có feature = -1
+    và giá trị trong ``value``. Duyệt cây vector hóa trên mọi cặp (dòng, cây) còn chưa tới lá.
+    """
+
+    def __init__(self, feature, threshold, children, value, roots, depth):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.depth = depth
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.feature, self.threshold, self.children, self.value, self.roots))
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    def leaf_values(self, X):
+        """Giá trị lá của mọi cây cho từng dòng của X (float32, C-contiguous): mảng (n_rows, n_trees, n_outputs)"""
+        n_rows, n_features = X.shape
+        n_trees = len(self.roots)
+        X_flat = X.ravel()
+        nodes = np.tile(self.roots, n_rows)
+        row_offset = np.repeat(np.arange(n_rows, dtype=np.int64) * n_features, n_trees)
+        active = np.flatnonzero(self.feature[nodes] >= 0)
+        while len(active):
+            current = nodes[active]
+            go_right = X_flat[row_offset[active] + self.feature[current]] > self.threshold[current]
+            current = self.children[2 * current + go_right]
+            nodes[active] = current
+            active = active[self.feature[current] >= 0]
+        return self.value[nodes].reshape(n_rows, n_trees, -1)
+
+
+class CompactForest:
+    """RandomForest/ExtraTrees: trung bình phân phối lớp (đã chuẩn hóa) ở lá của các cây"""
+
+    def __init__(self, trees):
+        self.trees = trees
+
+    def predict_proba(self, X):
+        return self.trees.leaf_values(X).mean(axis=1, dtype=np.float64)
+
+
+class CompactBoosting:
+    """GradientBoosting: raw = init + tổng (learning_rate * giá trị lá) theo từng lớp, rồi sigmoid/softmax"""
+
+    def __init__(self, trees, init_raw, n_outputs, exponential=False):
+        self.trees = trees
+        self.init_raw = init_raw
+        self.n_outputs = n_outputs
+        self.exponential = exponential
+
+    def predict_proba(self, X):
+        values = self.trees.leaf_values(X)[:, :, 0]
+        # Trees are stored stage by stage: tree t contributes to output t % n_outputs
+        raw = self.init_raw + values.reshape(len(X), -1, self.n_outputs).sum(axis=1, dtype=np.float64)
+        if self.n_outputs == 1:
+            positive = expit(2 * raw[:, 0] if self.exponential else raw[:, 0])
+            return np.column_stack([1 - positive, positive])
+        return softmax(raw, axis=1)
+
+
+class CompactTreeEnsemble:
+    """Bản xuất gọn của VotingClassifier soft-voting (RF/ExtraTrees/GB) với predict_proba theo lô"""
+
+    def __init__(self, members, weights, classes, feature_names=None, batch_size=4096):
+        self.members = members
+        self.weights = weights
+        self.classes_ = classes
+        self.feature_names = feature_names
+        self.batch_size = batch_size
+
+    @property
+    def nbytes(self):
+        """Kích thước các mảng node (byte)"""
+        return sum(member.trees.nbytes for _, member in self.members)
+
+    @property
+    def n_nodes(self):
+        return sum(member.trees.n_nodes for _, member in self.members)
+
+    def predict_proba(self, X):
+        """Xác suất từng lớp (trung bình có trọng số của các thành viên như VotingClassifier soft)"""
+        if self.feature_names is not None and hasattr(X, 'columns'):
+            X = X[self.feature_names]
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if len(X) > self.batch_size:
+            return np.concatenate([self.predict_proba(X[i:i + self.batch_size])
+                                   for i in range(0, len(X), self.batch_size)])
+        probas = [member.predict_proba(X) for _, member in self.members]
+        return np.average(probas, axis=0, weights=self.weights)
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+def _float32_threshold(threshold):
+    """Ngưỡng float32 lớn nhất <= ngưỡng gốc: với X float32, x <= t32 tương đương x <= t (như sklearn)"""
+    threshold32 = threshold.astype(np.float32)
+    rounded_up = threshold32.astype(np.float64) > threshold
+    threshold32[rounded_up] = np.nextafter(threshold32[rounded_up], np.float32(-np.inf))
+    return threshold32
+
+
+def _prune(tree, max_depth):
+    """Các node giữ lại khi cắt cây ở độ sâu max_depth (node ở độ sâu max_depth trở thành lá)"""
+    left, right = tree.children_left, tree.children_right
+    keep = np.zeros(tree.node_count, dtype=bool)
+    is_leaf = left == -1
+    frontier, depth = np.array([0]), 0
+    while True:
+        keep[frontier] = True
+        if max_depth is not None and depth == max_depth:
+            is_leaf[frontier] = True
+            break
+        internal = frontier[~is_leaf[frontier]]
+        if not len(internal):
+            break
+        frontier = np.concatenate([left[internal], right[internal]])
+        depth += 1
+    return keep, is_leaf, depth
+
+
+def flatten_trees(trees, leaf_value, max_depth=None):
+    """Trải phẳng danh sách cây sklearn (tree_) thành CompactTrees.
+
+    ``leaf_value(tree)`` trả về giá trị (n_nodes, n_outputs) của từng node; với max_depth, nhánh
+    sâu hơn được gộp vào node ở độ sâu max_depth (dùng giá trị của chính node đó).
+    """
+    parts = {name: [] for name in ('feature', 'threshold', 'children', 'value')}
+    roots, offset, depth = [], 0, 0
+    for tree in trees:
+        keep, is_leaf, tree_depth = _prune(tree, max_depth)
+        depth = max(depth, tree_depth)
+        new_index = np.cumsum(keep) - 1 + offset
+        old_nodes = np.flatnonzero(keep)
+        leaf = is_leaf[old_nodes]
+        left = np.where(leaf, -1, new_index[tree.children_left[old_nodes]])
+        right = np.where(leaf, -1, new_index[tree.children_right[old_nodes]])
+        parts['feature'].append(np.where(leaf, -1, tree.feature[old_nodes]).astype(np.int32))
+        parts['threshold'].append(np.where(leaf, np.float32(np.inf), _float32_threshold(tree.threshold[old_nodes])))
+        parts['children'].append(np.column_stack([left, right]).ravel().astype(np.int32))
+        parts['value'].append(leaf_value(tree)[old_nodes].astype(np.float32))
+        roots.append(offset)
+        offset += len(old_nodes)
+    arrays = {name: np.ascontiguousarray(np.concatenate(values)) for name, values in parts.items()}
+    return CompactTrees(arrays['feature'], arrays['threshold'].astype(np.float32), arrays['children'],
+                        arrays['value'], np.array(roots, dtype=np.int32), depth)
+
+
+def export_forest(forest, max_depth=None, max_trees=None):
+    """RandomForest/ExtraTrees -> CompactForest (giữ max_trees cây đầu nếu có)"""
+    def class_distribution(tree):
+        value = tree.value[:, 0, :]
+        return value / value.sum(axis=1, keepdims=True)
+    estimators = forest.estimators_[:max_trees] if max_trees else forest.estimators_
+    return CompactForest(flatten_trees([e.tree_ for e in estimators], class_distribution, max_depth))
+
+
+def boosting_init_raw(booster):
+    """Điểm raw ban đầu của GradientBoostingClassifier, tính từ ước lượng công khai ``init_``.
+
+    Như loss của sklearn: log-odds của predict_proba (nhân 0.5 với loss exponential) cho bài toán
+    hai lớp, log xác suất cho nhiều lớp; init='zero' cho điểm 0. Chỉ hỗ trợ init hằng số
+    (DummyClassifier mặc định), ngược lại báo ValueError.
+    """
+    n_outputs = booster.estimators_.shape[1]
+    if isinstance(booster.init_, str) and booster.init_ == 'zero':
+        return np.zeros(n_outputs, dtype=np.float64)
+    if not (isinstance(booster.init_, DummyClassifier) and booster.init_.strategy in CONSTANT_INIT_STRATEGIES):
+        raise ValueError(f"Init estimator {type(booster.init_).__name__} depends on the input, cannot be exported")
+    proba = booster.init_.predict_proba(np.zeros((1, booster.n_features_in_), dtype=np.float32))[0]
+    eps = np.finfo(np.float32).eps
+    proba = np.clip(np.asarray(proba, dtype=np.float64), eps, 1 - eps)
+    if n_outputs > 1:
+        return np.log(proba)
+    log_odds = np.log(proba[1] / (1 - proba[1]))
+    return np.array([0.5 * log_odds if booster.loss == 'exponential' else log_odds])
+
+
+def export_boosting(booster, max_depth=None):
+    """GradientBoostingClassifier -> CompactBoosting (learning_rate nhân sẵn vào giá trị lá)"""
+    def scaled_value(tree):
+        return booster.learning_rate * tree.value[:, 0, :]
+    n_outputs = booster.estimators_.shape[1]
+    trees = [estimator.tree_ for stage in booster.estimators_ for estimator in stage]
+    init_raw = boosting_init_raw(booster)
+    return CompactBoosting(flatten_trees(trees, scaled_value, max_depth), init_raw,
+                           n_outputs, exponential=booster.loss == 'exponential')
+
+
+def _export_member(name, estimator, max_depth=None, max_trees=None):
+    if isinstance(estimator, (RandomForestClassifier, ExtraTreesClassifier)):
+        return export_forest(estimator, max_depth, max_trees)
+    if isinstance(estimator, GradientBoostingClassifier):
+        return export_boosting(estimator, max_depth)
+    raise ValueError(f"Cannot export ensemble member '{name}' ({type(estimator).__name__})")
+
+
+def export_compact_ensemble(model, feature_names=None, max_depth=None, max_trees=None):
+    """Xuất VotingClassifier (soft) gồm RF/ExtraTrees/GB thành CompactTreeEnsemble.
+
+    ``max_depth``/``max_trees`` tạo biến thể rút gọn (cắt độ sâu, bớt cây của forest).
+    Báo ValueError nếu có thành viên không hỗ trợ.
+    """
+    if not isinstance(model, VotingClassifier) or model.voting != 'soft':
+        raise ValueError("Only soft-voting VotingClassifier ensembles can be exported")
+    members = []
+    for name, estimator in model.named_estimators_.items():
+        members.append((name, _export_member(name, estimator, max_depth, max_trees)))
+        if not np.array_equal(estimator.classes_, model.classes_):
+            raise ValueError(f"Ensemble member '{name}' has different classes")
+    return CompactTreeEnsemble(members, model.weights, model.classes_, feature_names)
+
+
+def export_compact_estimator(estimator, feature_names=None):
+    """Xuất một RandomForest/ExtraTrees/GradientBoosting đơn lẻ thành CompactTreeEnsemble một thành viên"""
+    name = type(estimator).__name__
+    return CompactTreeEnsemble([(name, _export_member(name, estimator))], None, estimator.classes_, feature_names)
@@ -11,14 +11,40 @@ Mô hình thống nhất cho 6 loại reasons & solutions:
 6. Self-Study (Tự học)
 """
 
+import os
+import time
 import pandas as pd
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
 from sklearn.preprocessing import LabelEncoder
+try:
+    from .config import REASONS_BACKENDS, REASONS_BACKEND_PARAMS, REASONS_PARALLEL, REASONS_MAX_WORKERS
+    from .estimators import make_estimator, backend_label
+except ImportError:
+    # Chạy trực tiếp dưới dạng script
+    from config import REASONS_BACKENDS, REASONS_BACKEND_PARAMS, REASONS_PARALLEL, REASONS_MAX_WORKERS
+    from estimators import make_estimator, backend_label
 import warnings
 warnings.filterwarnings('ignore')
 
+
+def fit_backend_job(dataset_key, backend, split, random_state=42, n_jobs=None):
+    """Fit một backend trên một dataset (chạy được trong process pool).
+
+    ``split`` là (X_train, X_test, y_train, y_test). Trả về
+    (dataset_key, backend, model, accuracy, số giây fit).
+    """
+    X_train, X_test, y_train, y_test = split
+    model = make_estimator(backend, REASONS_BACKEND_PARAMS.get(backend), random_state=random_state)
+    if n_jobs and 'n_jobs' in model.get_params():
+        model.set_params(n_jobs=n_jobs)
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    elapsed = time.perf_counter() - start
+    return dataset_key, backend, model, model.score(X_test, y_test), elapsed
+
 class UnifiedReasonsSolutionsModel:
     """Mô hình thống nhất cho tất cả các loại reasons & solutions"""
     
@@ -48,6 +74,9 @@ class UnifiedReasonsSolutionsModel:
         self.models = {}
         self.label_encoders = {}
         self.severity_encoders = {}
+        self.job_timings = {}
+        self.dataset_sizes = {}  # Record counts kept when datasets are not saved with the model
+        self.reason_store = None  # Columnar reason/solution store of a saved model (see reason_store.py)
         
     def load_all_datasets(self):
         """Tải tất cả các datasets"""
@@ -143,12 +172,8 @@ class UnifiedReasonsSolutionsModel:
         
         return X, y, df, feature_cols
     
-    def train_model(self, dataset_key, test_size=0.2, random_state=42):
-        """Huấn luyện mô hình cho một dataset cụ thể"""
-        print(f"\n{'=' * 80}")
-        print(f"HUẤN LUYỆN MÔ HÌNH: {self.DATASET_DESCRIPTIONS[dataset_key]}")
-        print(f"{'=' * 80}")
-        
+    def split_dataset(self, dataset_key, test_size=0.2, random_state=42):
+        """Chuẩn bị dữ liệu và chia train/test cho một dataset. Trả về (split, df, feature_cols) hoặc None"""
         X, y, df, feature_cols = self.prepare_training_data(dataset_key)
         
         if X is None:
@@ -156,75 +181,79 @@ class UnifiedReasonsSolutionsModel:
             return None
         
         # Split data
-        X_train, X_test, y_train, y_test = train_test_split(
+        split = train_test_split(
             X, y, test_size=test_size, random_state=random_state, stratify=y
         )
         
         print(f"📊 Dữ liệu:")
-        print(f"   - Train: {len(X_train)} mẫu")
-        print(f"   - Test:  {len(X_test)} mẫu")
+        print(f"   - Train: {len(split[0])} mẫu")
+        print(f"   - Test:  {len(split[1])} mẫu")
         print(f"   - Features: {feature_cols}")
+        return split, df, feature_cols
+    
+    def store_best_model(self, dataset_key, results, df, feature_cols):
+        """Lưu backend có accuracy cao nhất (results theo thứ tự REASONS_BACKENDS: (backend, model, score))"""
+        best = None
+        for backend, model, score in results:
+            if best is None or score > best[2]:
+                best = (backend, model, score)
         
-        # Train Random Forest
-        rf_model = RandomForestClassifier(
-            n_estimators=200,
-            max_depth=15,
-            min_samples_split=2,
-            random_state=random_state,
-            class_weight='balanced'
-        )
-        
-        rf_model.fit(X_train, y_train)
-        rf_score = rf_model.score(X_test, y_test)
-        
-        print(f"\n✅ Random Forest Accuracy: {rf_score:.4f}")
-        
-        # Train Gradient Boosting
-        gb_model = GradientBoostingClassifier(
-            n_estimators=100,
-            max_depth=10,
-            learning_rate=0.1,
-            random_state=random_state
-        )
-        
-        gb_model.fit(X_train, y_train)
-        gb_score = gb_model.score(X_test, y_test)
+        # Lưu mô hình tốt nhất
+        backend, model, score = best
+        self.models[dataset_key] = {
+            'model': model,
+            'type': backend_label(backend),
+            'accuracy': score,
+            'features': feature_cols,
+            'data': df
+        }
+        print(f"🏆 {self.DATASET_DESCRIPTIONS[dataset_key]}: chọn {backend_label(backend)} (accuracy: {score:.4f})")
+        return self.models[dataset_key]
+    
+    def train_model(self, dataset_key, test_size=0.2, random_state=42, n_jobs=None):
+        """Huấn luyện mô hình cho một dataset cụ thể"""
+        print(f"\n{'=' * 80}")
+        print(f"HUẤN LUYỆN MÔ HÌNH: {self.DATASET_DESCRIPTIONS[dataset_key]}")
+        print(f"{'=' * 80}")
         
-        print(f"✅ Gradient Boosting Accuracy: {gb_score:.4f}")
+        prepared = self.split_dataset(dataset_key, test_size, random_state)
+        if prepared is None:
+            return None
+        split, df, feature_cols = prepared
         
-        # Lưu mô hình tốt nhất
-        if rf_score >= gb_score:
-            self.models[dataset_key] = {
-                'model': rf_model,
-                'type': 'RandomForest',
-                'accuracy': rf_score,
-                'features': feature_cols,
-                'data': df
-            }
-            print(f"\n🏆 Chọn Random Forest (accuracy: {rf_score:.4f})")
-        else:
-            self.models[dataset_key] = {
-                'model': gb_model,
-                'type': 'GradientBoosting',
-                'accuracy': gb_score,
-                'features': feature_cols,
-                'data': df
-            }
-            print(f"\n🏆 Chọn Gradient Boosting (accuracy: {gb_score:.4f})")
+        # Train each candidate backend (REASONS_BACKENDS in config) and keep the most accurate
+        results = []
+        for backend in REASONS_BACKENDS:
+            _, _, model, score, elapsed = fit_backend_job(dataset_key, backend, split, random_state, n_jobs)
+            self.job_timings[(dataset_key, backend)] = elapsed
+            print(f"✅ {backend_label(backend)} Accuracy: {score:.4f} ({elapsed:.2f}s)")
+            results.append((backend, model, score))
         
-        return self.models[dataset_key]
+        return self.store_best_model(dataset_key, results, df, feature_cols)
     
-    def train_all_models(self):
-        """Huấn luyện tất cả các mô hình"""
+    def train_all_models(self, parallel=REASONS_PARALLEL, max_workers=REASONS_MAX_WORKERS):
+        """Huấn luyện tất cả các mô hình.
+
+        Ở chế độ song song, các job (dataset x backend) được chạy trên process pool với ngân sách
+        core chung (max_workers, mặc định số CPU); phần core còn lại chia cho n_jobs của từng estimator.
+        """
         print("\n" + "=" * 80)
         print("BẮT ĐẦU HUẤN LUYỆN TẤT CẢ CÁC MÔ HÌNH")
         print("=" * 80)
         
+        start = time.perf_counter()
+        budget = max_workers or os.cpu_count() or 1
+        jobs = [(key, backend) for key in self.datasets for backend in REASONS_BACKENDS]
+        workers = min(budget, len(jobs))
+        
         results = {}
-        for key in self.datasets.keys():
-            result = self.train_model(key)
-            if result:
-                results[key] = result
+        if parallel and workers > 1:
+            results = self.train_models_parallel(workers, max(1, budget // workers))
+        if not results:
+            for key in self.datasets.keys():
+                result = self.train_model(key, n_jobs=budget)
+                if result:
+                    results[key] = result
         
         print("\n" + "=" * 80)
         print("KẾT QUẢ HUẤN LUYỆN")
@@ -235,8 +264,50 @@ class UnifiedReasonsSolutionsModel:
                   f"{result['type']:20} | "
                   f"Accuracy: {result['accuracy']:.4f}")
         
+        self.report_job_timings(time.perf_counter() - start)
         return len(results)
     
+    def train_models_parallel(self, workers, n_jobs_per_job=1, random_state=42):
+        """Fit mọi job (dataset x backend) trên process pool. Trả về {} nếu pool không dùng được"""
+        prepared = {}
+        for key in self.datasets.keys():
+            print(f"\n📋 {self.DATASET_DESCRIPTIONS[key]}")
+            entry = self.split_dataset(key, random_state=random_state)
+            if entry is not None:
+                prepared[key] = entry
+        
+        print(f"\n🚀 Huấn luyện song song {len(prepared) * len(REASONS_BACKENDS)} jobs ({workers} workers)...")
+        fitted = {}
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(fit_backend_job, key, backend, split, random_state, n_jobs_per_job)
+                    for key, (split, _, _) in prepared.items() for backend in REASONS_BACKENDS
+                ]
+                for future in as_completed(futures):
+                    key, backend, model, score, elapsed = future.result()
+                    fitted[(key, backend)] = (model, score)
+                    self.job_timings[(key, backend)] = elapsed
+                    print(f"✅ {self.DATASET_DESCRIPTIONS[key]:30} | {backend_label(backend):20} | "
+                          f"Accuracy: {score:.4f} | {elapsed:.2f}s")
+        except BrokenProcessPool as e:
+            print(f"⚠️ Process pool không dùng được ({e}), huấn luyện tuần tự...")
+            return {}
+        
+        results = {}
+        for key, (_, df, feature_cols) in prepared.items():
+            candidates = [(backend, *fitted[(key, backend)]) for backend in REASONS_BACKENDS]
+            results[key] = self.store_best_model(key, candidates, df, feature_cols)
+        return results
+    
+    def report_job_timings(self, wall_time=None):
+        """In thời gian fit của từng job (dataset x backend)"""
+        print("\n⏱️ Thời gian huấn luyện từng job:")
+        for (key, backend), elapsed in self.job_timings.items():
+            print(f"   {key:20} {backend_label(backend):22} {elapsed:7.2f}s")
+        if wall_time is not None:
+            print(f"   {'Tổng (wall)':43} {wall_time:7.2f}s (tổng thời gian fit: {sum(self.job_timings.values()):.2f}s)")
+    
     def predict_reason_solution(self, dataset_key, features, top_k=3):
         """Dự đoán reasons & solutions cho một dataset cụ thể"""
         if dataset_key not in self.models:
@@ -246,7 +317,6 @@ class UnifiedReasonsSolutionsModel:
         
         model_info = self.models[dataset_key]
         model = model_info['model']
-        df = model_info['data']
         feature_names = model_info['features']
         
         # Tạo features đầy đủ
@@ -266,23 +336,29 @@ class UnifiedReasonsSolutionsModel:
         severity_label = self.severity_encoders[dataset_key].inverse_transform([severity_pred])[0]
         severity_confidence = severity_proba[severity_pred]
         
-        # Lấy top_k reasons & solutions
-        filtered_df = df[df['severity_level'] == severity_label].copy()
+        # Lấy top_k reasons & solutions: dữ liệu trong bộ nhớ (vừa train) hoặc kho reason_store (model đã lưu)
+        if 'data' in model_info:
+            df = model_info['data']
+            positions = np.flatnonzero((df['severity_level'] == severity_label).to_numpy())
+            num_rows = len(df)
+            text = lambda column, position: df[column].iat[position]
+        else:
+            store = self.reason_store
+            positions = store.positions(dataset_key, severity_label)
+            num_rows = store.num_rows(dataset_key)
+            text = lambda column, position: store.text(dataset_key, column, position)
         
-        if len(filtered_df) == 0:
-            filtered_df = df.copy()
+        if len(positions) == 0:
+            positions = np.arange(num_rows)
         
-        # Random sample top_k
-        if len(filtered_df) > top_k:
-            samples = filtered_df.sample(n=top_k, random_state=42)
-        else:
-            samples = filtered_df.sample(n=min(len(filtered_df), top_k), random_state=42)
+        # Random sample top_k (same draw as DataFrame.sample on the filtered rows)
+        samples = pd.Series(positions).sample(n=min(len(positions), top_k), random_state=42)
         
         results = []
-        for idx, row in samples.iterrows():
+        for position in samples:
             results.append({
-                'reason': row['reason_text'],
-                'solution': row['solution_text'],
+                'reason': text('reason_text', position),
+                'solution': text('solution_text', position),
                 'severity': severity_label,
                 'confidence': float(severity_confidence)
             })
@@ -297,7 +373,7 @@ class UnifiedReasonsSolutionsModel:
     def get_model_summary(self):
         """Lấy tóm tắt về các models"""
         summary = {
-            'total_datasets': len(self.datasets),
+            'total_datasets': len(self.datasets) or len(self.dataset_sizes),
             'total_models': len(self.models),
             'models': {}
         }
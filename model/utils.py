@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
-from difflib import get_close_matches
+from functools import lru_cache
+from .suggest_index import SuggestionIndex
 
 def convert_to_scale_6(score_10):
     """Chuyển đổi điểm hệ 10 sang hệ 6 theo công thức: hệ 6 = hệ 10 * 0.6"""
@@ -21,10 +22,37 @@ def convert_to_numeric(value):
     except (ValueError, TypeError):
         return 0
 
+@lru_cache(maxsize=8)
+def _suggestion_index(values):
+    return SuggestionIndex(values)
+
 def suggest_similar(input_value, valid_list, num_suggestions=3):
-    """Suggest similar values from a list"""
-    matches = get_close_matches(str(input_value), map(str, valid_list), n=num_suggestions, cutoff=0.6)
-    return matches
+    """Suggest similar values (n-gram, không phân biệt dấu/hoa thường; xem model/suggest_index.py).
+
+    ``valid_list`` là SuggestionIndex dựng sẵn (ví dụ DataLoader.suggestion_index['lecturer']) hoặc
+    danh sách giá trị; chỉ mục của danh sách được cache nên các lần gọi sau không dựng lại n-gram.
+    """
+    index = valid_list if isinstance(valid_list, SuggestionIndex) else _suggestion_index(tuple(valid_list))
+    return index.suggest(input_value, num_suggestions)
+
+def to_string_category(series):
+    """Chuyển một cột khóa sang categorical với category là chuỗi đã sắp xếp.
+
+    Giá trị giống astype(str) nhưng chỉ chuyển đổi các giá trị khác nhau (NaN giữ nguyên);
+    thứ tự category trùng thứ tự chuỗi nên sort/groupby/LabelEncoder cho kết quả như cột chuỗi.
+    """
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype('category')
+    categories = series.cat.categories
+    labels = categories.astype(str)
+    if labels.has_duplicates:
+        # Ví dụ 1 và '1' cùng xuất hiện: gộp như astype(str)
+        return series.astype(str).astype('category')
+    if not labels.equals(categories):
+        series = series.cat.rename_categories(labels)
+    if not labels.is_monotonic_increasing:
+        series = series.cat.reorder_categories(labels.sort_values())
+    return series
 
 def safe_float(x):
     """Safely convert value to float"""
@@ -9,6 +9,7 @@ import pickle
 import os
 import pandas as pd
 from typing import Dict, List, Optional
+from model.reason_store import load_reasons_model
 
 
 class ModelLoader:
@@ -70,9 +71,8 @@ class ModelLoader:
             print(f"{'=' * 80}")
             print(f"📁 File: {self.model_path}")
             
-            # Load model
-            with open(self.model_path, 'rb') as f:
-                self.model = pickle.load(f)
+            # Load model (estimators; reason/solution texts are opened lazily from reason_store/)
+            self.model = load_reasons_model(self.model_path)
             
             # Load metadata nếu có
             if hasattr(self, 'metadata_path') and os.path.exists(self.metadata_path):
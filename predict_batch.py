@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Dự đoán điểm CLO hàng loạt cho nhiều bộ (sinh viên, giảng viên, môn học)
+Dùng Predictor.predict_many: ghép feature vector hóa và predict_proba theo lô
+
+File đầu vào (.csv, .xlsx, .xls) cần các cột student_id, lecturer, subject_id
+(hoặc Student_ID, Lecturer_Name, Subject_ID / MSSV)
+
+Cách chạy:
+    python predict_batch.py dang_ky_hoc_phan.csv
+    python predict_batch.py dang_ky_hoc_phan.xlsx -o ket_qua.xlsx --batch-size 8192
+"""
+
+import os
+import sys
+import time
+import argparse
+import pandas as pd
+from model.config import PREDICT_BATCH_SIZE
+from model.predictor import CLOPredictor, BATCH_COLUMNS
+
+# Accepted input column names for each predict_many column
+COLUMN_ALIASES = {
+    'student_id': ['student_id', 'Student_ID', 'MSSV'],
+    'lecturer': ['lecturer', 'Lecturer_Name'],
+    'subject_id': ['subject_id', 'Subject_ID'],
+}
+
+
+def read_triples(path):
+    """Đọc file đầu vào thành DataFrame có các cột BATCH_COLUMNS (None nếu thiếu cột)"""
+    if path.endswith('.csv'):
+        df = pd.read_csv(path, dtype=str)
+    elif path.endswith(('.xlsx', '.xls')):
+        df = pd.read_excel(path, dtype=str)
+    else:
+        print("❌ Định dạng file không được hỗ trợ! Chỉ hỗ trợ .xlsx, .xls, .csv")
+        return None
+
+    columns = {}
+    for target, aliases in COLUMN_ALIASES.items():
+        found = next((col for col in aliases if col in df.columns), None)
+        if found is None:
+            print(f"❌ File thiếu cột {target} (chấp nhận: {', '.join(aliases)})")
+            print(f"   Các cột hiện có: {', '.join(df.columns.tolist())}")
+            return None
+        columns[found] = target
+    triples = df.rename(columns=columns)
+    for col in BATCH_COLUMNS:
+        triples[col] = triples[col].str.strip()
+    return triples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dự đoán điểm CLO hàng loạt")
+    parser.add_argument('input', help="File (sinh viên, giảng viên, môn học): .csv, .xlsx, .xls")
+    parser.add_argument('-o', '--output', help="File kết quả (mặc định <input>_predictions.csv)")
+    parser.add_argument('--batch-size', type=int, default=PREDICT_BATCH_SIZE,
+                        help=f"Số dòng mỗi lần predict_proba (mặc định {PREDICT_BATCH_SIZE})")
+    parser.add_argument('--optimize', action='store_true', help="Dùng model đã tối ưu tham số")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input):
+        print(f"❌ Không tìm thấy file: {args.input}")
+        sys.exit(1)
+    triples = read_triples(args.input)
+    if triples is None:
+        sys.exit(1)
+    print(f"✅ Đọc {len(triples)} dòng từ {args.input}")
+
+    predictor = CLOPredictor(optimize_params=args.optimize)
+
+    start = time.perf_counter()
+    results = predictor.predict_many(triples, batch_size=args.batch_size)
+    elapsed = time.perf_counter() - start
+    # Keep any extra input columns (names, class codes...) next to the predictions
+    extra = triples.drop(columns=BATCH_COLUMNS).reset_index(drop=True)
+    results = pd.concat([results, extra], axis=1)
+
+    output = args.output or f"{os.path.splitext(args.input)[0]}_predictions.csv"
+    if output.endswith(('.xlsx', '.xls')):
+        results.to_excel(output, index=False)
+    else:
+        results.to_csv(output, index=False, encoding='utf-8-sig')
+
+    ok = results[~results['error']]
+    print("\n" + "=" * 80)
+    print(f"Đã dự đoán {len(ok)}/{len(results)} dòng trong {elapsed:.2f}s "
+          f"({elapsed / max(len(results), 1) * 1e6:.0f} µs/dòng)")
+    if len(ok):
+        print(f"   Điểm dự đoán trung bình: {ok['predicted_score'].mean():.2f}/6")
+        print(f"   Mức rủi ro: {ok['risk_level'].value_counts().to_dict()}")
+        print(f"   Dòng tổng hợp (giảng viên/môn học chưa có trong lịch sử): {(ok['source'] == 'synthetic').sum()}")
+    errors = results[results['error']]
+    if len(errors):
+        print(f"   ⚠️ {len(errors)} dòng lỗi: {errors['message'].value_counts().to_dict()}")
+    print(f"💾 Đã lưu kết quả: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import LabelEncoder
+
+from model import model_store
+from model.config import MODEL_ARTIFACT_VERSION
+from model.data_loader import DataLoader
+from model.model_trainer import ModelTrainer
+
+
+def _encoder(classes):
+    encoder = LabelEncoder()
+    encoder.classes_ = np.asarray(classes, dtype=object)
+    return encoder
+
+
+def test_load_extended_artifact_reselects_features(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_store, 'CLO_MODEL_DIR', str(tmp_path))
+    data_loader = DataLoader(parallel_load=False)
+    data_loader.df = pd.DataFrame({
+        'Student_ID': ['s1', 's2', 's3', 's1'],
+        'Lecturer_Name': ['An', 'Binh', 'Chi', 'Binh'],
+        'study_hours': [1.0, 2.0, 3.0, 4.0],
+        'passed': [1, 0, 1, 1]
+    })
+    data_loader.df['student_id_encoded'] = data_loader.le_student_id.fit_transform(data_loader.df['Student_ID'])
+    data_loader.df['lecturer_encoded'] = data_loader.le_lecturer.fit_transform(data_loader.df['Lecturer_Name'])
+    data_loader.feature_names = ['student_id_encoded', 'lecturer_encoded', 'study_hours']
+
+    trainer = ModelTrainer(data_loader)
+    trainer.prepare_data()
+    stale = trainer.X.copy()
+
+    # Artifact trained before: different code order, 'Chi' and 's3' are appended by extend_encoders
+    artifact = {
+        'key': 'k', 'version': MODEL_ARTIFACT_VERSION, 'model': None,
+        'feature_names': list(data_loader.feature_names),
+        'encoders': {'le_student_id': _encoder(['s2', 's1']), 'le_lecturer': _encoder(['Binh', 'An'])},
+        'trained_through': None
+    }
+    model_path, _ = model_store._artifact_paths()
+    pd.to_pickle(artifact, model_path)
+
+    assert model_store.load_model_artifact(trainer, 'k')
+    features = data_loader.feature_names
+    pd.testing.assert_frame_equal(trainer.X, data_loader.df[features])
+    assert not trainer.X['lecturer_encoded'].equals(stale['lecturer_encoded'])
+    assert list(trainer.X['lecturer_encoded']) == [1, 0, 2, 0]
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from model.stats_tables import StatsTables
+
+
+def _grades(n):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'Lecturer_Name': pd.Categorical(rng.choice(['An', 'Binh', 'Chi'], n)),
+        'Subject_ID': rng.choice(['S1', 'S2', 'S3'], n),
+        'passed': rng.integers(0, 2, n),
+        'exam_score_6': np.where(rng.random(n) < 0.1, np.nan, rng.random(n) * 10)
+    })
+
+
+def _assert_same(tables, expected):
+    assert tables.rows == expected.rows
+    assert tables.fingerprint == expected.fingerprint
+    for name in ('subject', 'lecturer', 'lecturer_subject'):
+        got, want = getattr(tables, name), getattr(expected, name)
+        assert got.keys() == want.keys()
+        for key in want:
+            np.testing.assert_allclose(got[key], want[key])
+
+
+def test_appended_rows_match_full_build():
+    df = _grades(1000)
+    tables = StatsTables()
+    tables.build(df.iloc[:600])
+    assert not tables.refresh(df.iloc[:600])
+    for end in (700, 950, 1000):
+        assert tables.refresh(df.iloc[:end])
+    expected = StatsTables()
+    expected.build(df)
+    _assert_same(tables, expected)
+
+
+def test_edited_rows_trigger_rebuild():
+    df = _grades(1000)
+    tables = StatsTables()
+    tables.build(df)
+
+    edited = df.copy()
+    edited.loc[999, 'passed'] = 1 - edited.loc[999, 'passed']  # Last aggregated row is always checked
+    assert tables.refresh(edited)
+    edited.loc[123, 'exam_score_6'] = -1.0  # Any row, with a full check
+    assert tables.refresh(edited, full_check=True)
+
+    expected = StatsTables()
+    expected.build(edited)
+    _assert_same(tables, expected)
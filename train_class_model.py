@@ -7,8 +7,10 @@ Chỉ train model, không xử lý input/output
 
 import pickle
 import os
+import time
 from datetime import datetime
 from model.unified_reasons_solutions_model import UnifiedReasonsSolutionsModel
+from model.reason_store import save_reasons_model
 
 def train_class_model():
     """Train model cho phân tích lớp - CHỈ TRAIN MODEL"""
@@ -29,21 +31,21 @@ def train_class_model():
     model.load_all_datasets()
     
     print("\n🤖 Train models...")
+    start = time.perf_counter()
     model.train_all_models()
+    training_seconds = time.perf_counter() - start
     
-    # Lưu model
-    model_path = os.path.join(output_dir, "class_model.pkl")
-    print(f"\n💾 Lưu model: {model_path}")
-    
-    with open(model_path, 'wb') as f:
-        pickle.dump(model, f)
+    # Lưu model: file estimator gọn + kho reason/solution dạng cột (reason_store/)
+    print(f"\n💾 Lưu model: {os.path.join(output_dir, 'class_model.pkl')}")
+    model_path = save_reasons_model(model, output_dir, "class_model")
     
     # Lưu metadata
     metadata = {
         'trained_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
         'model_type': 'class',
         'num_datasets': len(model.datasets),
-        'total_records': sum(len(df) for df in model.datasets.values())
+        'total_records': sum(len(df) for df in model.datasets.values()),
+        'training_seconds': round(training_seconds, 2)
     }
     
     with open(os.path.join(output_dir, "metadata.pkl"), 'wb') as f:
@@ -52,6 +54,7 @@ def train_class_model():
     print(f"✅ Hoàn tất!")
     print(f"   Datasets: {metadata['num_datasets']}")
     print(f"   Records: {metadata['total_records']:,}")
+    print(f"   Thời gian train: {metadata['training_seconds']:.1f}s")
     print(f"   Saved: {output_dir}")
     
     return model